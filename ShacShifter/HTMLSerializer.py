@@ -1,9 +1,14 @@
 from .modules.NodeShape import NodeShape
 from .modules.PropertyShape import PropertyShape
+from .modules.DatatypePatterns import DatatypePatterns
 from .modules.StringSupplier import StringSupplier
 from .ShapeParser import ShapeParser
-from XSDreg import XSDreg
+from collections import OrderedDict
+import hashlib
+import io
 import logging
+import os
+import sys
 
 
 class HTMLPart:
@@ -18,7 +23,14 @@ class HTMLPart:
 
     def htmlRepr(self):
         """Build HTML"""
-        pass
+        return ''.join(self.htmlChunks())
+
+    def htmlChunks(self):
+        """Generate the HTML in chunks, in the order they are written.
+
+        returns: generator of strings
+        """
+        return iter(())
 
 
 class HTMLForm(HTMLPart):
@@ -27,6 +39,7 @@ class HTMLForm(HTMLPart):
                  targetSubjectsOf):
 
         """Initialize an HTMLForm object."""
+        self.id = ''
         self.label = ''
         self.description = {}
         self.root = ''
@@ -48,31 +61,29 @@ class HTMLForm(HTMLPart):
                 printdict[key] = value
         return ', '.join(['%s: %s' % (key, value) for (key, value) in printdict.items()])
 
-    def htmlRepr(self):
-        """Build HTML"""
-        plainHTML = StringSupplier().header.format(self.endpoint, self.ressourceIRI,
-                                                   self.namedGraph)
+    def htmlChunks(self):
+        """Generate the HTML in chunks"""
+        yield StringSupplier.header.format(
+            self.endpoint, self.ressourceIRI, self.namedGraph, id=self.id)
         if self.targetClass:
-            plainHTML += StringSupplier().headerTargetClassSelect
+            yield StringSupplier.headerTargetClassSelect
             for target in self.targetClass:
-                plainHTML += StringSupplier().headerTargetOption.format(target=target)
-            plainHTML += StringSupplier().headerTargetClassSelectClose
+                yield StringSupplier.headerTargetOption.format(target=target)
+            yield StringSupplier.headerTargetClassSelectClose
 
         if self.targetObjectsOf:
-            plainHTML += StringSupplier().headerTargetObjectsOfSelect
+            yield StringSupplier.headerTargetObjectsOfSelect
             for target in self.targetObjectsOf:
-                plainHTML += StringSupplier().headerTargetOption.format(target=target)
-            plainHTML += StringSupplier().headerTargetObjectsOfSelectClose
+                yield StringSupplier.headerTargetOption.format(target=target)
+            yield StringSupplier.headerTargetObjectsOfSelectClose
         if self.targetSubjectsOf:
-            plainHTML += StringSupplier().headerTargetSubjectsOfSelect
+            yield StringSupplier.headerTargetSubjectsOfSelect
             for target in self.targetSubjectsOf:
-                plainHTML += StringSupplier().headerTargetOption.format(target=target)
-            plainHTML += StringSupplier().headerTargetSubjectsOfSelectClose
+                yield StringSupplier.headerTargetOption.format(target=target)
+            yield StringSupplier.headerTargetSubjectsOfSelectClose
         for item in self.formItems:
-            plainHTML += item.htmlRepr()
-        plainHTML += StringSupplier().submit
-        plainHTML += StringSupplier().script
-        return plainHTML
+            yield from item.htmlChunks()
+        yield StringSupplier.submit
 
 
 class HTMLFormTemplate(HTMLPart):
@@ -86,10 +97,6 @@ class HTMLFormTemplate(HTMLPart):
         self.property = ''
         self.cardinality = {'min': 0, 'pref': 0}
 
-    def htmlRepr(self):
-        """Build HTML"""
-        pass
-
 
 class HTMLFormTextItem(HTMLFormTemplate):
     """A template item of type "group"."""
@@ -103,16 +110,17 @@ class HTMLFormTextItem(HTMLFormTemplate):
         self.datatype = ''
         self.pattern = ''
 
-    def htmlRepr(self):
-        """Build HTML"""
+    def htmlChunks(self):
+        """Generate the HTML in chunks"""
         maxSet = False
         if 'max' in self.cardinality:
             maxSet = True
-        if self.pattern == '' and self.datatype != '':
-            self.pattern = XSDreg.XSDreg().getRegex(self.datatype)
-        plainHTML = StringSupplier().propertyMainDiv.format(
-            self.id, self.cardinality['min'], self.cardinality['max'] if maxSet else 0,
-            self.datatype, self.pattern, self.label)
+        pattern = self.pattern
+        if pattern == '' and self.datatype != '':
+            pattern = DatatypePatterns.getPattern(self.datatype)
+        yield StringSupplier.propertyMainDiv.format(
+            self.id, self.property or self.id, self.cardinality['min'],
+            self.cardinality['max'] if maxSet else 0, self.datatype, pattern, self.label)
         disableChoice = 'disabled' if self.datatype != '' else ''
         counter = 1
         minFields = self.cardinality['pref']
@@ -122,18 +130,17 @@ class HTMLFormTextItem(HTMLFormTemplate):
             if maxSet and counter >= self.cardinality['max'] + 1:
                 break
 
-            datatypeLink = StringSupplier().datatypeLink.format(datatype=self.datatype)
-            plainHTML += StringSupplier().propertySubDiv.format(
+            datatypeLink = StringSupplier.datatypeLink.format(datatype=self.datatype)
+            yield StringSupplier.propertySubDiv.format(
                 'checked' if not disableChoice else '',
                 'checked' if disableChoice else '',
                 datatypeLink if self.datatype != '' else '',
-                self.id, id=(self.id + str(counter)), choice=disableChoice, pattern=self.pattern,
+                self.id, id=(self.id + str(counter)), choice=disableChoice, pattern=pattern,
                 jsclass=self.datatype.rsplit('#', 1)[-1])
             counter += 1
         nmin = ('min:' + str(self.cardinality['min']) + ' ') if self.cardinality['min'] else ""
         nmax = ('max:' + str(self.cardinality['max'])) if maxSet else ''
-        plainHTML += StringSupplier().propertyMainDivClose.format(self.id, nmin, nmax)
-        return plainHTML
+        yield StringSupplier.propertyMainDivClose.format(self.id, nmin, nmax)
 
 
 class HTMLFormChoiceItem(HTMLFormTemplate):
@@ -155,12 +162,23 @@ class HTMLFormChoiceItem(HTMLFormTemplate):
                 printdict[key] = [str(choice) for choice in value]
         return ', '.join(['%s: %s' % (key, value) for (key, value) in printdict.items()])
 
-    def htmlRepr(self):
-        """Build HTML"""
-        plainHTML = ""
+    def htmlChunks(self):
+        """Generate the HTML in chunks"""
         for choice in sorted(self.choices, key=lambda x: x.value, reverse=True):
-            plainHTML += choice.htmlRepr()
-        return plainHTML
+            yield from choice.htmlChunks()
+
+
+class HTMLFormShapeReference(HTMLPart):
+    """A collapsed reference to the form of a node shape, instead of a nested copy of it."""
+
+    def __init__(self, shapeUri, formId):
+        """Initialize an HTMLFormShapeReference object."""
+        self.shapeUri = shapeUri
+        self.formId = formId
+
+    def htmlChunks(self):
+        """Generate the HTML in chunks"""
+        yield StringSupplier.shapeReference.format(uri=self.shapeUri, formId=self.formId)
 
 
 class HTMLFormChoiceExpression(HTMLPart):
@@ -183,71 +201,164 @@ class HTMLFormChoiceExpression(HTMLPart):
                 printdict[key] = value
         return ', '.join(['%s: %s' % (key, value) for (key, value) in printdict.items()])
 
-    def htmlRepr(self):
-        """Build HTML"""
-        plainHTML = StringSupplier().choiceInput.format(
-                self.label, self.label, self.label)
+    def htmlChunks(self):
+        """Generate the HTML in chunks"""
+        yield StringSupplier.choiceInput.format(self.label, self.label, self.label)
 
 
 class HTMLSerializer:
-    """A Serializer that writes HTML."""
+    """A Serializer that writes HTML.
+
+    A serializer only holds its configuration. The forms are created from the shapes passed to
+    every call, so one serializer can serialize any number of shape maps.
+
+    All node shapes are rendered as forms of one page. The stylesheets, scripts and the script
+    of the forms are written once per page. The element ids of every form start with a prefix
+    derived from its node shape, so the ids stay unique in the page.
+
+    The script of the forms is inlined into the page, or in the external mode written once as a
+    static file next to the output file. The name of that file contains a hash of the script,
+    so it can be cached by browsers for as long as it exists.
+    """
 
     logger = logging.getLogger('ShacShifter.HTMLSerializer')
-    forms = []
-    outputfile = None
 
-    def __init__(self, nodeShapes, outputfile=None, endpoint="", ressourceIRI="", namedGraph=""):
-        """Initialize the Serializer and parse des ShapeParser results.
+    INLINE = 'inline'
+    EXTERNAL = 'external'
 
-        args: shapes
-              string outputfile
+    def __init__(self, outputfile=None, endpoint="", ressourceIRI="", namedGraph="",
+                 assets=INLINE):
+        """Initialize the Serializer.
+
+        args: string outputfile
               string endpoint
               string ressourceIRI
               string namedGraph
+              string assets, HTMLSerializer.INLINE or HTMLSerializer.EXTERNAL
         """
+        self.outputfile = None
+        self.assets = assets
         try:
-            fp = open(outputfile, 'w')
-            self.outputfile = outputfile
-            fp.close()
+            if outputfile is not None:
+                fp = open(outputfile, 'w')
+                self.outputfile = outputfile
+                fp.close()
         except Exception:
             self.logger.error('Can\'t write to file {}'.format(outputfile))
             self.logger.error('Content will be printed to sys.')
 
-        self.nodeShapes = nodeShapes
         self.endpoint = "http://localhost:8890/sparql" if (endpoint is None) else endpoint
         self.ressourceIRI = "http://www.example.org/a" if (ressourceIRI is None) else ressourceIRI
         self.namedGraph = "http://www.example.org/graph" if (namedGraph is None) else namedGraph
+        if assets == self.EXTERNAL and self.outputfile is None:
+            self.logger.error('The script can only be written next to an output file.')
+            self.logger.error('The script will be inlined.')
 
-        counter = 0
-        for nodeShape in nodeShapes:
-            if counter == 0:
-                form = self.createForm(nodeShapes[nodeShape])
-                self.forms.append(form)
-            else:
-                self.logger.info('HTMLSerializer only supports displaying one Nodeshape.')
-            counter += 1
+    def write(self, nodeShapes, fp=None):
+        """Write the HTMLForm of the shapes to a file object, the output file or sysout.
 
-    def write(self):
-        """Write HTMLForm to file or sysout."""
-        if self.outputfile:
-            fp = open(self.outputfile, 'w')
-            for form in self.forms:
-                htmlForm = form.toHTML()
-                print(StringSupplier().jqueryCDN)
-                print(htmlForm)
-                fp.write(StringSupplier().jqueryCDN)
-                fp.write(htmlForm + '\n')
-            fp.close()
+        args: dictionary of shapes
+              file object fp
+        """
+        if fp is not None:
+            self.writeForms(nodeShapes, fp)
+        elif self.outputfile:
+            with open(self.outputfile, 'w') as fp:
+                self.writeForms(nodeShapes, fp)
         else:
-            for form in self.forms:
-                print(StringSupplier().jqueryCDN)
-                print(form.toHTML())
+            self.writeForms(nodeShapes, sys.stdout)
+
+    def serialize(self, nodeShapes):
+        """Serialize the HTMLForm of the shapes.
+
+        args: dictionary of shapes
+        returns: string
+        """
+        fp = io.StringIO()
+        self.writeForms(nodeShapes, fp)
+        return fp.getvalue()
+
+    def writeForms(self, nodeShapes, fp):
+        """Write a page with the forms of the shapes, one form at a time, to a file object.
+
+        args: dictionary of shapes
+              file object fp
+        """
+        self.writePage((form.htmlChunks() for form in self.createForms(nodeShapes)), fp)
+
+    def writePage(self, forms, fp):
+        """Write a page with the assets of the forms and the forms to a file object.
+
+        args: iterable of the forms, each an iterable of HTML chunks
+              file object fp
+        """
+        fp.write(StringSupplier.assets)
+        for chunks in forms:
+            for chunk in chunks:
+                fp.write(chunk)
+            fp.write('\n')
+        fp.write(self.getScript() + '\n')
+
+    def getScript(self):
+        """Get the script element of a page, write the script file in the external mode.
+
+        returns: string
+        """
+        if self.assets == self.EXTERNAL and self.outputfile:
+            fileName = self.writeRuntime(os.path.dirname(os.path.abspath(self.outputfile)))
+            return StringSupplier.scriptReference.format(fileName)
+        return StringSupplier.script
 
-    def createForm(self, nodeShape):
+    def writeRuntime(self, directory):
+        """Write the script of the forms to a file named by the hash of its content.
+
+        The file is only written if it does not exist yet. Pages of all versions of ShacShifter
+        can share a directory, every version of the script has its own file.
+
+        args: string directory
+        returns: string name of the file
+        """
+        content = StringSupplier.runtime.encode('utf-8')
+        fileName = 'shacshifter-forms.{}.js'.format(hashlib.sha1(content).hexdigest()[:16])
+        filePath = os.path.join(directory, fileName)
+        if not os.path.exists(filePath):
+            # a page must never reference a partially written script
+            temporaryPath = '{}.{}.tmp'.format(filePath, os.getpid())
+            with open(temporaryPath, 'wb') as fp:
+                fp.write(content)
+            os.replace(temporaryPath, filePath)
+        return fileName
+
+    def createForms(self, nodeShapes):
+        """Create the forms of the shapes one at a time.
+
+        args: dictionary of shapes
+        returns: generator of HTMLForm
+        """
+        for shapeKey in nodeShapes:
+            yield self.createForm(nodeShapes[shapeKey], nodeShapes, shapeKey)
+
+    def getFormId(self, shapeKey):
+        """Get the element id of the form of a node shape, it prefixes all ids of the form.
+
+        args: string shapeKey, the key of the shape in the dictionary of shapes, which is also
+              set for shapes of blank nodes
+        returns: string
+        """
+        return 'form-' + hashlib.sha1(shapeKey.encode('utf-8')).hexdigest()[:8]
+
+    def createForm(self, nodeShape, nodeShapes, shapeKey=None):
         """Evaluate a nodeShape.
 
         args:   NodeShape nodeShape
+                dictionary nodeShapes, the shapes referenced with sh:node are looked up here
+                string shapeKey of the shape in nodeShapes, the URI of the shape if None
         """
+        if shapeKey is None:
+            shapeKey = nodeShape.uri
+        formId = self.getFormId(shapeKey)
+        idPrefix = formId + '-'
+
         def addNodeLabel():
             label = 'Template: ' + nodeShape.uri
             if nodeShape.isSet['targetClass']:
@@ -261,51 +372,59 @@ class HTMLSerializer:
             return label
 
         def sortPropertyShapes(nodeShape):
-            groups = list()
-            groupedShapes = list()
+            """Sort the property shapes by the order of their group and their own order.
+
+            The shapes are put into one bucket per group in a single pass, shapes without group
+            come first. The first shape of every bucket gets a heading with the group label.
+
+            returns: list of tuples (PropertyShape, string heading)
+            """
+            buckets = OrderedDict()
             for propertyShape in nodeShape.properties:
-                if propertyShape.isSet['group'] and propertyShape.group.isSet['order']:
-                    if propertyShape.group.order not in groups:
-                        groups.append(propertyShape.group.order)
-                else:
-                    if -1 not in groups:
-                        groups.append(-1)
-            groups.sort()
-            for group in groups:
-                shapes = list()
-                for propertyShape in nodeShape.properties:
-                    if propertyShape.isSet['group'] and propertyShape.group.isSet['order']:
-                        if propertyShape.group.order == group:
-                            shapes.append(propertyShape)
-                    else:
-                        if group == -1:
-                            shapes.append(propertyShape)
-                groupedShapes.append(sorted(shapes, key=lambda x: x.order, reverse=False))
-            for shapes in groupedShapes:
-                groupname = ''
-                if 'default' not in shapes[0].name:
-                    shapes[0].name['default'] = ''
-                if shapes[0].isSet['group']:
-                    groupname = '<b>' + shapes[0].group.rdfsLabel['default'] + '</b><br>'
-                # isSet['name'] is still False if it was prior, important for later check
-                shapes[0].name['default'] = '<hr>' + groupname + shapes[0].name['default']
-            return [y for x in groupedShapes for y in x]
-
-        def addFormItems(nodeShape):
+                group = propertyShape.group if propertyShape.isSet['group'] else None
+                buckets.setdefault(group, []).append(propertyShape)
+
+            def groupOrder(group):
+                return -1 if group is None or group.order is None else group.order
+
+            sortedShapes = []
+            for group in sorted(buckets, key=groupOrder):
+                heading = '<hr>'
+                if group is not None:
+                    heading += '<b>' + group.getLabel() + '</b><br>'
+                for propertyShape in sorted(buckets[group], key=lambda x: x.order):
+                    sortedShapes.append((propertyShape, heading))
+                    heading = ''
+            return sortedShapes
+
+        # every node shape is expanded once per form, at its first sh:node reference, with ids
+        # prefixed by the id of its own form. Later references and cycles are rendered as
+        # reference to the form of the node shape, so a form grows linearly with its shapes.
+        expandedShapes = set()
+
+        def addFormItems(nodeShape, shapeKey, idPrefix):
             """Check Propertey Shapes to fill the templates."""
+            expandedShapes.add(shapeKey)
             formItems = []
-            for propertyShape in sortPropertyShapes(nodeShape):
-                formItem = self.getFormItem(propertyShape, nodeShape.nodeKind)
+            for propertyShape, heading in sortPropertyShapes(nodeShape):
+                formItem = self.getFormItem(
+                    propertyShape, nodeShape.nodeKind, idPrefix, heading)
                 if formItem is not None:
                     formItems.append(formItem)
                     if propertyShape.isSet['nodes']:
-                        subFormItems = []
                         for node in propertyShape.nodes:
-                            subFormItems.extend(addFormItems(self.nodeShapes[node]))
-                        if len(subFormItems) > 0:
-                            formItems.extend(subFormItems)
+                            formItems.extend(getSubFormItems(node))
             return formItems
 
+        def getSubFormItems(node):
+            if node in expandedShapes:
+                self.logger.info('Repeated or cyclic sh:node reference to {}'.format(node))
+                return [HTMLFormShapeReference(node, self.getFormId(node))]
+            if node not in nodeShapes:
+                self.logger.info('Node shape not found: {}'.format(node))
+                return []
+            return addFormItems(nodeShapes[node], node, idPrefix + self.getFormId(node) + '-')
+
         targetClass, targetObjectsOf, targetSubjectsOf = (None, )*3
         if nodeShape.isSet['targetClass']:
             targetClass = nodeShape.targetClass
@@ -318,15 +437,18 @@ class HTMLSerializer:
         form.label = addNodeLabel()
         if nodeShape.isSet['message']:
             form.description = nodeShape.message
+        form.id = formId
         form.root = nodeShape.uri
         if len(nodeShape.properties) > 0:
-            form.formItems = addFormItems(nodeShape)
+            form.formItems = addFormItems(nodeShape, shapeKey, idPrefix)
         return form
 
-    def getFormItem(self, propertyShape, nodeKind):
+    def getFormItem(self, propertyShape, nodeKind, idPrefix='', heading=''):
         """Evaluate a propertyShape to serialize a formObject section.
 
         args:   PropertyShape propertyShape
+                string idPrefix of the element ids of the form
+                string heading in front of the label, e.g. of a property group
         return: HTMLFormItem
         """
         def initFormItem():
@@ -350,10 +472,11 @@ class HTMLSerializer:
             return item
 
         def fillBasicItemValues(item):
-            item.id = propertyShape.path
-            item.label = propertyShape.name['default'] if propertyShape.isSet['name'] else (
-                                    propertyShape.name['default'] +
-                                    propertyShape.path.rsplit('/', 1)[-1])
+            item.id = idPrefix + propertyShape.path.iri
+            item.property = propertyShape.path.iri
+            name = propertyShape.name.get('default') if propertyShape.isSet['name'] else None
+            item.label = heading + (
+                name if name is not None else propertyShape.path.iri.rsplit('/', 1)[-1])
             item.description = getDescription()
             item.nodeKind = nodeKind
             item.pattern = propertyShape.pattern + propertyShape.flags
@@ -368,7 +491,7 @@ class HTMLSerializer:
             elif propertyShape.isSet['description']:
                 return {'en': propertyShape.description}
             else:
-                return {'en': 'This is about ' + propertyShape.path}
+                return {'en': 'This is about ' + propertyShape.path.iri}
 
         def getCardinality():
             cardinality = {'min': 0, 'pref': 1}
@@ -381,12 +504,12 @@ class HTMLSerializer:
 
             return cardinality
 
-        if isinstance(propertyShape.path, dict):
-            # TODO handle complex paths (inverse, oneOrMorePath ...)
-            self.logger.info('Complex path not supported, yet')
-        elif isinstance(propertyShape.path, list):
-            # TODO handle sequence paths
-            self.logger.info('Sequence path not supported, yet')
+        if not propertyShape.isSet['path']:
+            self.logger.info('Property shape without well-formed path')
+        elif not propertyShape.path.isPredicatePath:
+            # TODO handle complex paths (sequence, inverse, oneOrMorePath ...)
+            self.logger.info('Complex path not supported, yet: {}'.format(
+                propertyShape.path.sparql))
         else:
             item = initFormItem()
             return item
@@ -399,7 +522,7 @@ class HTMLSerializer:
         """
         choices = []
         for choice in propertyShape.shIn:
-            choiceItem = HTMLChoiceExpression()
+            choiceItem = HTMLFormChoiceExpression()
             choiceItem.label = choice
             choiceItem.value = choice
             choices.append(choiceItem)
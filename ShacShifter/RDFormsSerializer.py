@@ -1,8 +1,12 @@
 from .modules.NodeShape import NodeShape
 from .modules.PropertyShape import PropertyShape
 from .ShapeParser import ShapeParser
+from .modules.JsonStreamWriter import JsonStreamWriter
+import hashlib
+import io
 import json
 import logging
+import sys
 
 
 class RDFormsPart:
@@ -164,7 +168,8 @@ class RDFormsChoiceExpression(RDFormsPart):
         self.description = ''
         self.top = False
         self.selectable = True
-        self.children = {}
+        # the values of the child choices in a choice hierarchy
+        self.children = []
 
     def __str__(self):
         """Print RDFormsChoiceExpression object."""
@@ -186,42 +191,120 @@ class RDFormsChoiceExpression(RDFormsPart):
 
 
 class RDFormsSerializer:
-    """A serializer for RDForms."""
+    """A serializer for RDForms.
+
+    A serializer only holds its configuration. The template bundles are created from the shapes
+    passed to every call, so one serializer can serialize any number of shape maps.
+
+    In the dedup mode every distinct template is only emitted once, in the first bundle that
+    uses it. Its id is a hash of its structure and the path moves to the property of the
+    template. The root of every bundle is a group template that references the templates of the
+    node shape by id.
+    """
 
     logger = logging.getLogger('ShacShifter.RDFormsSerializer')
-    templateBundles = []
-    outputfile = None
 
-    def __init__(self, nodeShapes, outputfile=None):
-        """Initialize the Serializer and parse des ShapeParser results.
+    def __init__(self, outputfile=None, jsonMode=JsonStreamWriter.PRETTY, dedup=False):
+        """Initialize the Serializer.
 
-        args: shapes
-              string outputfile
+        args: string outputfile
+              string jsonMode, one of JsonStreamWriter.modes
+              boolean dedup
         """
+        self.outputfile = None
+        self.jsonMode = jsonMode
+        self.dedup = dedup
         try:
-            fp = open(outputfile, 'w')
-            self.outputfile = outputfile
-            fp.close()
+            if outputfile is not None:
+                fp = open(outputfile, 'w')
+                self.outputfile = outputfile
+                fp.close()
         except Exception:
             self.logger.error('Can''t write to file {}'.format(outputfile))
             self.logger.error('Content will be printed to sys.')
 
+    def write(self, nodeShapes, fp=None):
+        """Write the RDForms of the shapes to a file object, the output file or sysout.
+
+        args: dictionary of shapes
+              file object fp
+        """
+        if fp is not None:
+            self.writeBundles(nodeShapes, fp)
+        elif self.outputfile:
+            with open(self.outputfile, 'w') as fp:
+                self.writeBundles(nodeShapes, fp)
+        else:
+            self.writeBundles(nodeShapes, sys.stdout)
+
+    def serialize(self, nodeShapes):
+        """Serialize the RDForms of the shapes.
+
+        args: dictionary of shapes
+        returns: string
+        """
+        fp = io.StringIO()
+        self.writeBundles(nodeShapes, fp)
+        return fp.getvalue()
+
+    def writeBundles(self, nodeShapes, fp):
+        """Stream the template bundles of the shapes one by one to a file object.
+
+        args: dictionary of shapes
+              file object fp
+        """
+        writer = JsonStreamWriter(fp, self.jsonMode)
+        for bundle in self.createTemplateBundles(nodeShapes):
+            writer.write(bundle.jsonRepr())
+        writer.close()
+
+    def createTemplateBundles(self, nodeShapes):
+        """Create the template bundles of the shapes one at a time.
+
+        args: dictionary of shapes
+        returns: generator of RDFormsTemplateBundle
+        """
+        # the ids of the templates emitted in this call, only used in the dedup mode
+        templateIds = set()
         for nodeShape in nodeShapes:
             bundle = self.createTemplateBundle(nodeShapes[nodeShape])
-            self.templateBundles.append(bundle)
-
-    def write(self):
-        """Write RDForms to file or sysout."""
-        if self.outputfile:
-            fp = open(self.outputfile, 'w')
-            for bundle in self.templateBundles:
-                jsonstring = bundle.toJson()
-                print(jsonstring)
-                fp.write(jsonstring + '\n')
-            fp.close()
-        else:
-            for bundle in self.templateBundles:
-                print(bundle.toJson())
+            if self.dedup:
+                self.deduplicateTemplates(bundle, templateIds)
+            yield bundle
+
+    def deduplicateTemplates(self, bundle, templateIds):
+        """Replace the templates of a bundle by references to distinct templates.
+
+        args: RDFormsTemplateBundle bundle
+              set templateIds of the templates that were already emitted, new ids are added
+        """
+        references = []
+        templates = []
+        for template in bundle.templates:
+            templateId = self.getTemplateId(template)
+            references.append(templateId)
+            if templateId in templateIds:
+                continue
+            templateIds.add(templateId)
+            if template.property == '':
+                template.property = template.id
+            template.id = templateId
+            templates.append(template)
+
+        group = RDFormsGroupItem()
+        group.id = bundle.root
+        group.label = bundle.label
+        group.items = references
+        bundle.templates = [group] + templates
+
+    def getTemplateId(self, template):
+        """Get the structural hash of a template.
+
+        args: RDFormsTemplate template
+        returns: string
+        """
+        content = json.dumps(template.jsonRepr(), sort_keys=True)
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()[:16]
 
     def createTemplateBundle(self, nodeShape):
         """Evaluate a nodeShape.
@@ -284,9 +367,9 @@ class RDFormsSerializer:
             return item
 
         def fillBasicItemValues(item):
-            item.id = propertyShape.path
+            item.id = propertyShape.path.iri
             item.label = propertyShape.name if propertyShape.isSet['name'] else (
-                                    propertyShape.path.rsplit('/', 1)[-1])
+                                    propertyShape.path.iri.rsplit('/', 1)[-1])
             item.description = getDescription()
             return item
 
@@ -296,7 +379,7 @@ class RDFormsSerializer:
             elif propertyShape.isSet['description']:
                 return {'en': propertyShape.description}
             else:
-                return {'en': 'This is about ' + propertyShape.path}
+                return {'en': 'This is about ' + propertyShape.path.iri}
 
         def getCardinality():
             cardinality = {'min': 0, 'pref': 1}
@@ -309,12 +392,12 @@ class RDFormsSerializer:
 
             return cardinality
 
-        if isinstance(propertyShape.path, dict):
-            # TODO handle complex paths (inverse, oneOrMorePath ...)
-            self.logger.info('Complex path not supported, yet')
-        elif isinstance(propertyShape.path, list):
-            # TODO handle sequence paths
-            self.logger.info('Sequence path not supported, yet')
+        if not propertyShape.isSet['path']:
+            self.logger.info('Property shape without well-formed path')
+        elif not propertyShape.path.isPredicatePath:
+            # TODO handle complex paths (sequence, inverse, oneOrMorePath ...)
+            self.logger.info('Complex path not supported, yet: {}'.format(
+                propertyShape.path.sparql))
         else:
             item = initTemplateItem()
             return item
@@ -322,6 +405,9 @@ class RDFormsSerializer:
     def getChoices(self, propertyShape):
         """Search for choice candidates in propertyShape and return a choice list.
 
+        The members of sh:in are a flat list, every choice is a top level choice without
+        children. The value and label of a choice share the member string.
+
         args: PropertyShape propertyShape
         returns: list
         """
@@ -330,7 +416,7 @@ class RDFormsSerializer:
             choiceItem = RDFormsChoiceExpression()
             choiceItem.label = choice
             choiceItem.value = choice
-            choiceItem.children = set(propertyShape.shIn) - set([choice])
+            choiceItem.top = True
             choices.append(choiceItem)
 
         return choices
@@ -2,12 +2,15 @@
 
 import sys
 import os
+import rdflib
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')))
 
 from ShacShifter.HTMLSerializer import HTMLSerializer
 from ShacShifter.RDFormsSerializer import RDFormsSerializer
 from ShacShifter.ShapeParser import ShapeParser
+from ShacShifter.ShapeWatcher import ShapeWatcher
+from ShacShifter.modules.ShapeCache import ShapeCache
 import logging
 
 
@@ -17,17 +20,58 @@ class ShacShifter:
     logger = logging.getLogger('ShacShifter')
 
     # def __init__(self):
-    def shift(self, input, output, format, endpoint, ressourceIRI, namedGraph):
+    def shift(self, input, output, format, endpoint, ressourceIRI, namedGraph, streaming=False,
+              cacheDirectory=None, cacheSize=64 * 1024 * 1024, processes=None,
+              checkProcesses=None, jsonMode='pretty', dedup=False, assets='inline'):
         """Transform input to output with format."""
         self.logger.debug('Start Shifting from {} into {}'.format(input, output))
-        parser = ShapeParser()
-        parseResult = parser.parseShape(input)
+        parseResult = self.parse(
+            input, streaming, cacheDirectory, cacheSize, processes, checkProcesses)
 
         if (format == "html"):
-            writer = HTMLSerializer(parseResult, output, endpoint, ressourceIRI, namedGraph)
-            writer.write()
+            writer = HTMLSerializer(output, endpoint, ressourceIRI, namedGraph, assets)
+            writer.write(parseResult)
         elif (format == "rdforms"):
-            writer = RDFormsSerializer(parseResult, output)
-            writer.write()
+            writer = RDFormsSerializer(output, jsonMode, dedup)
+            writer.write(parseResult)
         else:
             writer = None
+
+    def watch(self, input, output, format, endpoint, ressourceIRI, namedGraph, jsonMode='pretty',
+              assets='inline'):
+        """Transform input to output with format every time the input changes."""
+        self.logger.debug('Start watching {}'.format(input))
+        ShapeWatcher(
+            input, output, format, endpoint, ressourceIRI, namedGraph, jsonMode=jsonMode,
+            assets=assets
+        ).watch()
+
+    def parse(self, input, streaming=False, cacheDirectory=None, cacheSize=64 * 1024 * 1024,
+              processes=None, checkProcesses=None):
+        """Parse the input, use the cached shapes if the input was parsed before.
+
+        args: string input or list of strings
+              boolean streaming
+              string cacheDirectory, no cache is used if it is None, it has to be trusted
+                     because the cached shapes are pickled
+              int cacheSize in bytes
+              int processes
+              int checkProcesses
+        returns: dictionary of shapes
+        """
+        if cacheDirectory is None:
+            return ShapeParser().parseShape(
+                input, streaming, processes, checkProcesses=checkProcesses)
+
+        cache = ShapeCache(cacheDirectory, cacheSize)
+        inputFiles = ShapeParser().getInputFiles(input, streaming)
+        key = cache.getKey(inputFiles, ShapeParser.version, rdflib.__version__, streaming)
+        parseResult = cache.load(key)
+        if parseResult is not None:
+            self.logger.debug('Loaded shapes of {} from cache'.format(input))
+            return parseResult
+
+        parseResult = ShapeParser().parseShape(
+            inputFiles, streaming, processes, checkProcesses=checkProcesses)
+        cache.store(key, parseResult)
+        return parseResult
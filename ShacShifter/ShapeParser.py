@@ -1,10 +1,23 @@
 #!/usr/bin/env python3
 
+import glob
 import logging
+import os
+import sys
 import rdflib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from .modules.WellFormedShape import WellFormedShape
 from .modules.NodeShape import NodeShape
 from .modules.PropertyShape import PropertyShape
+from .modules.PropertyPath import PropertyPath
+from .modules.PropertyGroup import PropertyGroup
+from .modules.GraphConstraintCheck import GraphConstraintCheck
+from .modules.LazyShapeMap import LazyShapeMap
+from .modules.ShapeGraphIndex import ShapeGraphIndex
+from .modules.ShaclListDecoder import ShaclListDecoder
+from .modules.StreamingShapeLoader import StreamingShapeLoader
+from .modules.Exceptions import ShaclListConstraintError, ShapeConflictError, ShapeCycleError
 from .modules.WellFormedShapeConstraintCheck import WellFormedShapeConstraintCheck
 
 
@@ -12,6 +25,8 @@ class ShapeParser:
     """A parser for SHACL Shapes."""
 
     logger = logging.getLogger('ShacShifter.ShapeParser')
+    # increase if the parse result changes, it invalidates cached shapes
+    version = 6
 
     def __init__(self):
         self.rdf = rdflib.Namespace('http://www.w3.org/1999/02/22-rdf-syntax-ns#')
@@ -20,53 +35,397 @@ class ShapeParser:
         self.g = rdflib.Graph()
         self.wellFormedShapes = {}
         self.propertyShapes = {}
-
-    def parseShape(self, inputFilePath):
+        self.index = None
+        self.graphCheck = None
+        # errors of shapes that were checked before parsing, keyed by shape node
+        self.checkedErrors = {}
+        self.conflicts = OrderedDict()
+        self.listDecoder = ShaclListDecoder(self.g)
+        # every distinct property path is created once, paths are also kept by path node
+        self.propertyPaths = {}
+        self.nodePaths = {}
+        # kinds of complex paths, in the order they are looked for
+        self.pathKinds = OrderedDict([
+            (self.sh.alternativePath, PropertyPath.ALTERNATIVE),
+            (self.sh.inversePath, PropertyPath.INVERSE),
+            (self.sh.zeroOrMorePath, PropertyPath.ZERO_OR_MORE),
+            (self.sh.oneOrMorePath, PropertyPath.ONE_OR_MORE),
+            (self.sh.zeroOrOnePath, PropertyPath.ZERO_OR_ONE)
+        ])
+        # every property group is created once and shared by its property shapes
+        self.propertyGroups = {}
+        # every shape node is parsed once, shapes referenced again are shared
+        self.parsedShapes = {}
+        self.shapesInProgress = set()
+        # every distinct string of the model is stored once, keyed by its rdflib term
+        self.internedStrings = {}
+        self.statistics = {
+            'uniqueShapes': 0, 'cacheHits': 0, 'internedStrings': 0, 'internedBytesSaved': 0
+        }
+        # shape calls and interned terms, keyed by the shape, path or group that is parsed,
+        # only recorded in worker processes to merge their statistics
+        self.parseLog = None
+        self.parseOwner = None
+        # parameters that make a shape a node shape, without a path
+        self.nodeShapePredicates = [
+            self.sh.targetClass, self.sh.targetNode, self.sh.targetObjectsOf,
+            self.sh.targetSubjectsOf, self.sh.property
+        ]
+        # SHACL parameters and their handlers, applied in this order to every shape node
+        self.parameterHandlers = OrderedDict([
+            (self.sh.targetClass, ('targetClass', self.parseStrings)),
+            (self.sh.targetNode, ('targetNode', self.parseStrings)),
+            (self.sh.targetObjectsOf, ('targetObjectsOf', self.parseStrings)),
+            (self.sh.targetSubjectsOf, ('targetSubjectsOf', self.parseStrings)),
+            (self.sh.ignoredProperties, ('ignoredProperties', self.parseStringList)),
+            (self.sh.message, ('message', self.parseLanguageMap)),
+            (self.sh.nodeKind, ('nodeKind', self.parseString)),
+            (self.sh.closed, ('closed', self.parseBoolean)),
+            (self.sh.property, ('properties', self.parsePropertyShapes)),
+            (self.sh.path, ('path', self.parsePath)),
+            (self.sh['class'], ('classes', self.parseStrings)),
+            (self.sh.datatype, ('datatype', self.parseString)),
+            (self.sh.minCount, ('minCount', self.parseInteger)),
+            (self.sh.maxCount, ('maxCount', self.parseInteger)),
+            (self.sh.minExclusive, ('minExclusive', self.parseInteger)),
+            (self.sh.minInclusive, ('minInclusive', self.parseInteger)),
+            (self.sh.maxExclusive, ('maxExclusive', self.parseInteger)),
+            (self.sh.maxInclusive, ('maxInclusive', self.parseInteger)),
+            (self.sh.minLength, ('minLength', self.parseInteger)),
+            (self.sh.maxLength, ('maxLength', self.parseInteger)),
+            (self.sh.pattern, ('pattern', self.parseString)),
+            (self.sh.flags, ('flags', self.parseString)),
+            (self.sh.languageIn, ('languageIn', self.parseStringList)),
+            (self.sh.uniqueLang, ('uniqueLang', self.parseBoolean)),
+            (self.sh.equals, ('equals', self.parseStrings)),
+            (self.sh.disjoint, ('disjoint', self.parseStrings)),
+            (self.sh.lessThan, ('lessThan', self.parseStrings)),
+            (self.sh.lessThanOrEquals, ('lessThanOrEquals', self.parseStrings)),
+            (self.sh.node, ('nodes', self.parseStrings)),
+            (self.sh.hasValue, ('hasValue', self.parseTerms)),
+            (self.sh['in'], ('shIn', self.parseList)),
+            (self.sh.order, ('order', self.parseInteger)),
+            (self.sh.qualifiedValueShape, ('qualifiedValueShape', self.parseNestedShape)),
+            (self.sh.qualifiedValueShapesDisjoint,
+                ('qualifiedValueShapesDisjoint', self.parseBoolean)),
+            (self.sh.qualifiedMinCount, ('qualifiedMinCount', self.parseInteger)),
+            (self.sh.qualifiedMaxCount, ('qualifiedMaxCount', self.parseInteger)),
+            (self.sh.group, ('group', self.parsePropertyGroup)),
+            (self.sh.name, ('name', self.parseLanguageMap)),
+            (self.sh.description, ('description', self.parseLanguageMap)),
+            (self.rdfs.label, ('rdfsLabel', self.parseLanguageMap))
+        ])
+
+    def parseShape(self, inputFilePath, streaming=False, processes=None, lazy=False,
+                   checkProcesses=None):
         """Parse a Shape given in a file.
 
-        args: string inputFilePath
+        In streaming mode the file has to be N-Triples or N-Quads. It is read line by line and
+        only the triples of the shapes are kept, instance data is discarded while reading.
+        Several files, directories or glob patterns can be given as list. With more than one
+        process the files are read and the root shapes are parsed in a process pool.
+        In lazy mode a LazyShapeMap is returned, it parses a root shape when it is first
+        accessed. With more than one check process the constraints of all shapes are checked in
+        a process pool before the shapes are parsed.
+
+        args: string inputFilePath or list of strings
+              boolean streaming
+              int processes
+              boolean lazy
+              int checkProcesses
         returns: list of dictionaries for nodeShapes and propertyShapes
         """
-        self.g.parse(inputFilePath, format='turtle')
-        wellFormedShapeUris = self.getWellFormedShapeUris()
+        self.loadGraph(inputFilePath, streaming, processes)
+        rootShapeUris = self.getRootShapeUris()
+
+        if checkProcesses is not None and checkProcesses > 1 and not lazy:
+            self.checkShapes(rootShapeUris, checkProcesses)
+
+        if lazy:
+            return LazyShapeMap(self, rootShapeUris)
+
+        if processes is not None and processes > 1 and len(rootShapeUris) > 1:
+            # every worker parses every n-th root shape, shapes are shared within a worker only
+            chunks = [rootShapeUris[i::processes] for i in range(processes)]
+            # the errors of the check pool are used by the workers that parse the shapes
+            with ProcessPoolExecutor(
+                    processes, initializer=initShapeParserWorker,
+                    initargs=(self.getGraphSnapshot(), self.checkedErrors)
+            ) as pool:
+                workerStates = list(pool.map(parseShapesInWorker, chunks))
+            for workerState in workerStates:
+                self.mergeWorkerState(workerState)
+            for shapeUri in rootShapeUris:
+                wellFormedShape = self.parsedShapes[shapeUri]
+                self.addConflictErrors(wellFormedShape, shapeUri)
+                self.wellFormedShapes[str(shapeUri)] = wellFormedShape
+        else:
+            for shapeUri in rootShapeUris:
+                self.wellFormedShapes[str(shapeUri)] = self.parseRootShape(shapeUri)
+
+        # errors of shapes that were not parsed again must not be used by a later parse
+        self.checkedErrors.clear()
+
+        self.logger.debug(
+            'Parsed {uniqueShapes} unique shapes, {cacheHits} cache hits, {internedStrings} '
+            'interned strings saved {internedBytesSaved} bytes'.format(**self.statistics))
 
-        for shapeUri in wellFormedShapeUris:
-            wellFormedShape = self.parseWellFormedShape(shapeUri)
-            self.wellFormedShapes[str(shapeUri)] = wellFormedShape
+        return self.wellFormedShapes
 
-        unusedPropertyShapes = []
-        for shapeUri in self.wellFormedShapes:
-            if isinstance(self.wellFormedShapes[shapeUri], PropertyShape):
-                unusedPropertyShapes.append(shapeUri)
+    def mergeWorkerState(self, workerState):
+        """Merge the shapes parsed by a worker process into the state of this parser.
 
-        for shapeUri in unusedPropertyShapes:
-            self.wellFormedShapes.pop(shapeUri)
+        Shapes, paths, groups and strings that were also parsed by another worker are kept from
+        the first worker. The shape calls and interned terms of the worker are only counted for
+        the shapes, paths and groups that are kept, so the statistics equal those of a serial
+        parse.
 
-        return self.wellFormedShapes
+        args: dictionary of the worker state, as returned by parseShapesInWorker
+        """
+        keptOwners = set([None])
+        keptOwners.update(
+            ('shape', shapeUri) for shapeUri in workerState['parsedShapes']
+            if shapeUri not in self.parsedShapes)
+        keptOwners.update(
+            ('path', node) for node in workerState['nodePaths'] if node not in self.nodePaths)
+        keptOwners.update(
+            ('group', groupUri) for groupUri in workerState['propertyGroups']
+            if groupUri not in self.propertyGroups)
+
+        for shapeUri, shape in workerState['parsedShapes'].items():
+            self.parsedShapes.setdefault(shapeUri, shape)
+        for shapeUri, shape in workerState['propertyShapes'].items():
+            self.propertyShapes.setdefault(shapeUri, shape)
+        for group in workerState['propertyGroups'].items():
+            self.propertyGroups.setdefault(*group)
+        for path in workerState['propertyPaths']:
+            self.propertyPaths.setdefault(path, path)
+        for node, path in workerState['nodePaths'].items():
+            self.nodePaths.setdefault(node, path)
+
+        for owner, (shapeCalls, terms) in workerState['parseLog'].items():
+            if owner not in keptOwners:
+                continue
+            self.statistics['cacheHits'] += shapeCalls
+            for term in terms:
+                if term in self.internedStrings:
+                    self.statistics['internedBytesSaved'] += sys.getsizeof(
+                        self.internedStrings[term])
+                else:
+                    self.internedStrings[term] = workerState['internedStrings'][term]
+                    self.statistics['internedStrings'] += 1
+        # every shape call that did not parse a kept shape is a cache hit
+        newShapes = sum(1 for owner in keptOwners if owner is not None and owner[0] == 'shape')
+        self.statistics['uniqueShapes'] += newShapes
+        self.statistics['cacheHits'] -= newShapes
 
-    def getWellFormedShapeUris(self):
-        """Get URIs of all Root Node shapes.
+    def checkShapes(self, rootShapeUris, processes):
+        """Check the constraints of all shapes reachable from root shapes in a process pool.
 
-        returns: list of Node Shape URIs
+        Every worker checks every n-th shape on its own copy of the graph, the errors are
+        used when the shapes are parsed.
+
+        args: list of root Shape URIs
+              int processes
+        """
+        shapeUris = self.getReachableShapeUris(rootShapeUris)
+        chunks = [shapeUris[i::processes] for i in range(processes)]
+        with ProcessPoolExecutor(
+                processes, initializer=initShapeParserWorker, initargs=(self.getGraphSnapshot(),)
+        ) as pool:
+            checkedChunks = list(pool.map(checkShapesInWorker, chunks))
+        for chunk, checkedChunk in zip(chunks, checkedChunks):
+            self.checkedErrors.update(zip(chunk, checkedChunk))
+
+    def checkShape(self, shapeUri):
+        """Get the constraint errors of a shape, use the errors of an earlier check if possible.
+
+        args: string shapeUri
+        returns: list of errors
+        """
+        if shapeUri in self.checkedErrors:
+            return self.checkedErrors.pop(shapeUri)
+        wfscc = WellFormedShapeConstraintCheck(
+            self.g, shapeUri, self.listDecoder, self.getGraphCheck())
+        return wfscc.errors
+
+    def getReachableShapeUris(self, rootShapeUris):
+        """Get the root shapes and all shapes they reference and that are parsed with them.
+
+        args: list of root Shape URIs
+        returns: list of Shape URIs
+        """
+        shapePredicates = set([self.sh.property, self.sh.qualifiedValueShape])
+        shapeUris = OrderedDict((shapeUri, True) for shapeUri in rootShapeUris)
+        nodes = list(shapeUris)
+
+        while nodes:
+            for predicate, object in self.g.predicate_objects(nodes.pop()):
+                if predicate in shapePredicates and object not in shapeUris:
+                    shapeUris[object] = True
+                    nodes.append(object)
+
+        return list(shapeUris)
+
+    def getGraphSnapshot(self):
+        """Get a copy of the triples of the graph for worker processes.
+
+        The triples are grouped by subject, so the objects of a subject keep their order in
+        the graph of a worker.
+
+        returns: list of triples
+        """
+        triples = []
+        for subject in self.getIndex().subjects:
+            triples += self.g.triples((subject, None, None))
+        return triples
+
+    def parseRootShape(self, shapeUri):
+        """Parse a root shape of the loaded graph.
+
+        args: string shapeUri
+        returns: shape
+        """
+        wellFormedShape = self.parseWellFormedShape(shapeUri)
+        self.addConflictErrors(wellFormedShape, shapeUri)
+        return wellFormedShape
+
+    def addConflictErrors(self, wellFormedShape, shapeUri):
+        """Add an error to a root shape that is defined in more than one file.
+
+        args: shape wellFormedShape
+              string shapeUri
+        """
+        if shapeUri in self.conflicts:
+            wellFormedShape.errors.append(ShapeConflictError(
+                'Shape is defined in more than one file:{} ({})'.format(
+                    shapeUri, ', '.join(self.conflicts[shapeUri]))))
+
+    def loadGraph(self, inputFilePath, streaming=False, processes=None):
+        """Load files into the graph of the parser and index it.
+
+        Shapes that are defined in more than one file are collected in self.conflicts.
+
+        args: string inputFilePath or list of strings
+              boolean streaming
+              int processes
+        """
+        inputFiles = self.getInputFiles(inputFilePath, streaming)
+
+        if len(inputFiles) == 1:
+            if streaming:
+                StreamingShapeLoader().load(inputFiles[0], self.g)
+            else:
+                self.g.parse(inputFiles[0], format='turtle')
+        else:
+            if processes is not None and processes > 1:
+                with ProcessPoolExecutor(processes) as pool:
+                    results = list(pool.map(
+                        loadTriples, inputFiles, [streaming] * len(inputFiles)))
+            else:
+                results = [loadTriples(inputFile, streaming) for inputFile in inputFiles]
+
+            definitions = OrderedDict()
+            for inputFile, triples in zip(inputFiles, results):
+                for shapeUri in self.getDefinedShapeUris(triples):
+                    definitions.setdefault(shapeUri, []).append(inputFile)
+                for triple in triples:
+                    self.g.add(triple)
+
+            for shapeUri, definingFiles in definitions.items():
+                if len(definingFiles) > 1:
+                    self.logger.warning('Shape {} is defined in more than one file: {}'.format(
+                        shapeUri, ', '.join(definingFiles)))
+                    self.conflicts[shapeUri] = definingFiles
+
+        self.index = ShapeGraphIndex(self.g)
+
+    def getInputFiles(self, inputFilePath, streaming=False):
+        """Expand files, directories and glob patterns to a list of files.
+
+        Directories are expanded to the Turtle files in them, or to the N-Triples and N-Quads
+        files in streaming mode. A FileNotFoundError is raised for a glob pattern that matches
+        no files and if no files are found at all.
+
+        args: string inputFilePath or list of strings
+              boolean streaming
+        returns: list of file paths
+        """
+        if isinstance(inputFilePath, str):
+            inputFilePath = [inputFilePath]
+        extensions = ('.nt', '.nq') if streaming else ('.ttl',)
+
+        inputFiles = []
+        for path in inputFilePath:
+            if os.path.isdir(path):
+                inputFiles += sorted(
+                    os.path.join(path, name) for name in os.listdir(path)
+                    if name.endswith(extensions)
+                )
+            elif any(character in path for character in '*?['):
+                matchingFiles = sorted(glob.glob(path))
+                if not matchingFiles:
+                    raise FileNotFoundError('No files match the pattern {}'.format(path))
+                inputFiles += matchingFiles
+            else:
+                inputFiles.append(path)
+
+        if not inputFiles:
+            raise FileNotFoundError('No shape files found in {}'.format(', '.join(inputFilePath)))
+        return inputFiles
+
+    def getDefinedShapeUris(self, triples):
+        """Get the URIs of all named nodes described with SHACL predicates or types.
+
+        args: list of triples
+        returns: set of URIs
+        """
+        shapeUris = set()
+        for s, p, o in triples:
+            if isinstance(s, rdflib.term.URIRef) and (
+                    p.startswith(self.sh) or (p == self.rdf.type and o.startswith(self.sh))):
+                shapeUris.add(s)
+        return shapeUris
+
+    def getRootShapeUris(self):
+        """Get the URIs of all root shapes that are parsed by parseShape.
+
+        returns: list of Shape URIs
+        """
+        index = self.getIndex()
+        # root shapes with a path are property shapes that are not used by any node shape
+        return [
+            shapeUri for shapeUri in self.getWellFormedShapeUris()
+            if shapeUri not in index.pathSubjects
+        ]
+
+    def getIndex(self):
+        """Get the reference index of the graph, build it if necessary.
+
+        returns: ShapeGraphIndex
+        """
+        if self.index is None:
+            self.index = ShapeGraphIndex(self.g)
+        return self.index
+
+    def getGraphCheck(self):
+        """Get the constraint check of all shapes of the graph, check the graph if necessary.
+
+        returns: GraphConstraintCheck
         """
-        wellFormedShapeUris = list()
+        if self.graphCheck is None:
+            self.graphCheck = GraphConstraintCheck(self.g)
+        return self.graphCheck
 
-        qres = self.g.query("""
-            PREFIX sh: <http://www.w3.org/ns/shacl#>
-            SELECT DISTINCT ?root
-            WHERE {{
-                ?root ?s ?o .
-                FILTER NOT EXISTS {?a ?b ?root .}
-                }
-                UNION
-                {
-                ?s sh:node ?root
-                }}""")
+    def getWellFormedShapeUris(self):
+        """Get URIs of all Root Node shapes.
 
-        for row in qres:
-            wellFormedShapeUris.append(row.root)
+        Roots are all subjects that are not used as object in the graph and all objects of
+        sh:node.
 
-        return wellFormedShapeUris
+        returns: list of Node Shape URIs
+        """
+        return self.getIndex().getRootNodes()
 
     def getPropertyShapeCandidates(self):
         """Get all property shapes.
@@ -76,332 +435,363 @@ class ShapeParser:
 
         returns: list of Property Shape URIs
         """
-        propertyShapeUris = set()
+        return self.getIndex().getPropertyShapeCandidates()
 
-        for stmt in self.g.subjects(self.sh.path, None):
-            if (self.g.value(predicate=self.sh.property, object=stmt) is None and
-                    self.g.value(predicate=self.rdf.first, object=stmt) is None and
-                    self.g.value(predicate=self.sh['not'], object=stmt) is None):
-                propertyShapeUris.add(stmt)
+    def getShapeParameters(self, shapeUri):
+        """Collect the values of all known parameters of a shape in one scan.
 
-        return propertyShapeUris
+        args:    string shapeUri
+        returns: dict of lists of rdflib terms, keyed by predicate
+        """
+        parameters = {}
+
+        for predicate, object in self.g.predicate_objects(shapeUri):
+            if predicate in self.parameterHandlers:
+                if predicate in parameters:
+                    parameters[predicate].append(object)
+                else:
+                    parameters[predicate] = [object]
+
+        return parameters
 
     def parseWellFormedShape(self, shapeUri):
         """Parse a WellFormedShape given by its URI.
 
+        Shapes are memoized by their node, so a shape that is referenced several times is
+        parsed once and shared.
+
         args:    string shapeUri
         returns: object WellFormedShape/NodeShape/PropertyShape
         """
+        self.logParse()
+        if shapeUri in self.parsedShapes:
+            self.statistics['cacheHits'] += 1
+            return self.parsedShapes[shapeUri]
+
+        self.shapesInProgress.add(shapeUri)
+        parentOwner, self.parseOwner = self.parseOwner, ('shape', shapeUri)
+        parameters = self.getShapeParameters(shapeUri)
         # consider allowing different rdf predicates like title for headings etc.
-        wellFormedShape = WellFormedShape()
+        shapeClass = self.getShapeClass(shapeUri, parameters)
+        shape = shapeClass()
         # test for most relevant constraints
-        wfscc = WellFormedShapeConstraintCheck(self.g, shapeUri)
-        wellFormedShape.errors = wfscc.errors
+        shape.errors = self.checkShape(shapeUri)
         # add variable for invalidation, and maybe create "critical errors"
-        # if len(wellFormedShape.errors) > 0:
+        # if len(shape.errors) > 0:
         #     return None
         # if empty "URI's" are bad change it later on to add Blanknodes too
         if not isinstance(shapeUri, rdflib.term.BNode):
-            wellFormedShape.isSet['uri'] = True
-            wellFormedShape.uri = str(shapeUri)
-
-        for stmt in self.g.objects(shapeUri, self.sh.targetClass):
-            wellFormedShape.isSet['targetClass'] = True
-            wellFormedShape.targetClass.append(str(stmt))
-
-        for stmt in self.g.objects(shapeUri, self.sh.targetNode):
-            wellFormedShape.isSet['targetNode'] = True
-            wellFormedShape.targetNode.append(str(stmt))
-
-        for stmt in self.g.objects(shapeUri, self.sh.targetObjectsOf):
-            wellFormedShape.isSet['targetObjectsOf'] = True
-            wellFormedShape.targetObjectsOf.append(str(stmt))
-
-        for stmt in self.g.objects(shapeUri, self.sh.targetSubjectsOf):
-            wellFormedShape.isSet['targetSubjectsOf'] = True
-            wellFormedShape.targetSubjectsOf.append(str(stmt))
-
-        val = self.g.value(subject=shapeUri, predicate=self.sh.ignoredProperties)
-        if val is not None:
-            wellFormedShape.isSet['ignoredProperties'] = True
-            properties = val
-            lastListEntry = False
-
-            while not lastListEntry:
-                wellFormedShape.ignoredProperties.append(
-                    str(self.g.value(subject=properties, predicate=self.rdf.first))
-                )
-                # check if this was the last entry in the list
-                if self.g.value(subject=properties, predicate=self.rdf.rest) == self.rdf.nil:
-                    lastListEntry = True
-                properties = self.g.value(subject=properties, predicate=self.rdf.rest)
-
-        for stmt in self.g.objects(shapeUri, self.sh.message):
-            wellFormedShape.isSet['message'] = True
-            if (stmt.language is None):
-                wellFormedShape.message['default'] = str(stmt)
-            else:
-                wellFormedShape.message[stmt.language] = str(stmt)
-
-        val = self.g.value(subject=shapeUri, predicate=self.sh.nodeKind)
-        if val is not None:
-            wellFormedShape.isSet['nodeKind'] = True
-            wellFormedShape.nodeKind = str(val)
-
-        val = self.g.value(subject=shapeUri, predicate=self.sh.closed)
-        if val is not None:
-            wellFormedShape.isSet['closed'] = True
-            if (str(val).lower() == "true"):
-                wellFormedShape.closed = True
-
-        for stmt in self.g.objects(shapeUri, self.sh.property):
-            wellFormedShape.isSet['property'] = True
-            propertyShape = self.parseWellFormedShape(stmt)
-            wellFormedShape.errors += propertyShape.errors
-            self.propertyShapes[stmt] = propertyShape
-            wellFormedShape.properties.append(propertyShape)
-
-        pathStart = self.g.value(subject=shapeUri, predicate=self.sh.path)
-        if pathStart is not None:
-            wellFormedShape.isSet['path'] = True
-            wellFormedShape.path = self.getPropertyPath(pathStart)
-
-        for stmt in self.g.objects(shapeUri, self.sh['class']):
-            wellFormedShape.isSet['classes'] = True
-            wellFormedShape.classes.append(str(stmt))
-
-        val = self.g.value(subject=shapeUri, predicate=self.sh.datatype)
-        if val is not None:
-            wellFormedShape.isSet['datatype'] = True
-            wellFormedShape.datatype = str(val)
-
-        minCount = self.g.value(subject=shapeUri, predicate=self.sh.minCount)
-        if minCount is not None:
-            wellFormedShape.isSet['minCount'] = True
-            wellFormedShape.minCount = int(minCount)
-
-        maxCount = self.g.value(subject=shapeUri, predicate=self.sh.maxCount)
-        if maxCount is not None:
-            wellFormedShape.isSet['maxCount'] = True
-            wellFormedShape.maxCount = int(maxCount)
-
-        val = self.g.value(subject=shapeUri, predicate=self.sh.minExclusive)
-        if val is not None:
-            wellFormedShape.isSet['minExclusive'] = True
-            wellFormedShape.minExclusive = int(val)
-
-        val = self.g.value(subject=shapeUri, predicate=self.sh.minInclusive)
-        if val is not None:
-            wellFormedShape.isSet['minInclusive'] = True
-            wellFormedShape.minInclusive = int(val)
-
-        val = self.g.value(subject=shapeUri, predicate=self.sh.maxExclusive)
-        if val is not None:
-            wellFormedShape.isSet['maxExclusive'] = True
-            wellFormedShape.maxExclusive = int(val)
-
-        val = self.g.value(subject=shapeUri, predicate=self.sh.maxInclusive)
-        if val is not None:
-            wellFormedShape.isSet['maxInclusive'] = True
-            wellFormedShape.maxInclusive = int(val)
-
-        val = self.g.value(subject=shapeUri, predicate=self.sh.minLength)
-        if val is not None:
-            wellFormedShape.isSet['minLength'] = True
-            wellFormedShape.minLength = int(val)
-
-        val = self.g.value(subject=shapeUri, predicate=self.sh.maxLength)
-        if val is not None:
-            wellFormedShape.isSet['maxLength'] = True
-            wellFormedShape.maxLength = int(val)
-
-        val = self.g.value(subject=shapeUri, predicate=self.sh.pattern)
-        if val is not None:
-            wellFormedShape.isSet['pattern'] = True
-            wellFormedShape.pattern = str(val)
-
-        val = self.g.value(subject=shapeUri, predicate=self.sh.flags)
-        if val is not None:
-            wellFormedShape.isSet['flags'] = True
-            wellFormedShape.flags = str(val)
-
-        val = self.g.value(subject=shapeUri, predicate=self.sh.languageIn)
-        if val is not None:
-            wellFormedShape.isSet['languageIn'] = True
-            languages = val
-            lastListEntry = False
-
-            while not lastListEntry:
-                wellFormedShape.languageIn.append(
-                    str(self.g.value(subject=languages, predicate=self.rdf.first))
-                )
-                # check if this was the last entry in the list
-                if self.g.value(subject=languages, predicate=self.rdf.rest) == self.rdf.nil:
-                    lastListEntry = True
-                languages = self.g.value(subject=languages, predicate=self.rdf.rest)
-
-        val = self.g.value(subject=shapeUri, predicate=self.sh.uniqueLang)
-        if val is not None:
-            wellFormedShape.isSet['uniqueLang'] = True
-            if (str(val).lower() == "true"):
-                wellFormedShape.uniqueLang = True
-
-        for stmt in self.g.objects(shapeUri, self.sh.equals):
-            wellFormedShape.isSet['equals'] = True
-            wellFormedShape.equals.append(str(stmt))
-
-        for stmt in self.g.objects(shapeUri, self.sh.disjoint):
-            wellFormedShape.isSet['disjoint'] = True
-            wellFormedShape.disjoint.append(str(stmt))
-
-        for stmt in self.g.objects(shapeUri, self.sh.lessThan):
-            wellFormedShape.isSet['lessThan'] = True
-            wellFormedShape.lessThan.append(str(stmt))
-
-        for stmt in self.g.objects(shapeUri, self.sh.lessThanOrEquals):
-            wellFormedShape.isSet['lessThanOrEquals'] = True
-            wellFormedShape.lessThanOrEquals.append(str(stmt))
-
-        for stmt in self.g.objects(shapeUri, self.sh.node):
-            wellFormedShape.isSet['nodes'] = True
-            wellFormedShape.nodes.append(str(stmt))
-
-        for stmt in self.g.objects(shapeUri, self.sh.hasValue):
-            wellFormedShape.isSet['hasValue'] = True
-            wellFormedShape.hasValue.append(stmt)
-
-        val = self.g.value(subject=shapeUri, predicate=self.sh['in'])
-        if val is not None:
-            wellFormedShape.isSet['shIn'] = True
-            lastListEntry = False
-
-            while True:
-                first_value = self.g.value(subject=val, predicate=self.rdf.first)
-                rest_value = self.g.value(subject=val, predicate=self.rdf.rest)
-                wellFormedShape.shIn.append(first_value)
-                # check if this was the last entry in the list
-                if rest_value == self.rdf.nil:
-                    break
-                val = rest_value
-
-        val = self.g.value(subject=shapeUri, predicate=self.sh.order)
-        if val is not None:
-            wellFormedShape.isSet['order'] = True
-            wellFormedShape.order = int(val)
+            shape.isSet['uri'] = True
+            shape.uri = self.internString(shapeUri)
+
+        # handlers are applied in table order, independent of the triple order in the graph
+        for predicate, (attribute, handler) in self.parameterHandlers.items():
+            if predicate in parameters:
+                value = handler(shape, parameters[predicate])
+                # referenced shapes are parsed even if the shape class has no field for them
+                if value is not None and attribute in shapeClass.fields:
+                    shape.isSet[attribute] = True
+                    setattr(shape, attribute, value)
+
+        self.shapesInProgress.discard(shapeUri)
+        self.parseOwner = parentOwner
+        self.parsedShapes[shapeUri] = shape
+        self.statistics['uniqueShapes'] += 1
 
-        # QVS can have multiple Instances per Path, but every ProperyShape can only have 1
-        val = self.g.value(subject=shapeUri, predicate=self.sh.qualifiedValueShape)
-        if val is not None:
-            wellFormedShape.isSet['qualifiedValueShape'] = True
-            wellFormedShape.qualifiedValueShape = self.parseWellFormedShape(val)
-            wellFormedShape.errors += wellFormedShape.qualifiedValueShape.errors
-
-        val = self.g.value(subject=shapeUri, predicate=self.sh.qualifiedValueShapesDisjoint)
-        if val is not None:
-            wellFormedShape.isSet['qualifiedValueShapesDisjoint'] = True
-            if (str(val).lower() == "true"):
-                wellFormedShape.qualifiedValueShapesDisjoint = True
-                # TODO check Sibling Shapes
-
-        val = self.g.value(subject=shapeUri, predicate=self.sh.qualifiedMinCount)
-        if val is not None:
-            wellFormedShape.isSet['qualifiedMinCount'] = True
-            wellFormedShape.qualifiedMinCount = int(val)
-
-        val = self.g.value(subject=shapeUri, predicate=self.sh.qualifiedMaxCount)
-        if val is not None:
-            wellFormedShape.isSet['qualifiedMaxCount'] = True
-            wellFormedShape.qualifiedMaxCount = int(val)
-
-        val = self.g.value(subject=shapeUri, predicate=self.sh.group)
-        if val is not None:
-            wellFormedShape.isSet['group'] = True
-            wellFormedShape.group = self.parseWellFormedShape(val)
-            wellFormedShape.errors += wellFormedShape.group.errors
-
-        for stmt in self.g.objects(shapeUri, self.sh.name):
-            wellFormedShape.isSet['name'] = True
-            if (stmt.language is None):
-                wellFormedShape.name['default'] = str(stmt)
-            else:
-                wellFormedShape.name[stmt.language] = str(stmt)
+        return shape
 
-        for stmt in self.g.objects(shapeUri, self.sh.description):
-            wellFormedShape.isSet['description'] = True
-            if (stmt.language is None):
-                wellFormedShape.description['default'] = str(stmt)
-            else:
-                wellFormedShape.description[stmt.language] = str(stmt)
+    def getShapeClass(self, shapeUri, parameters):
+        """Decide the class of a shape by its path and type.
+
+        Shapes with a path are property shapes. Shapes of type sh:NodeShape and shapes with
+        targets or property shapes are node shapes, parameters that a NodeShape has no field
+        for are not kept. All other shapes, e.g. qualified value shapes, are WellFormedShapes.
 
-        for stmt in self.g.objects(shapeUri, self.rdfs.label):
-            wellFormedShape.isSet['rdfsLabel'] = True
-            if (stmt.language is None):
-                wellFormedShape.rdfsLabel['default'] = str(stmt)
+        args:    string shapeUri
+                 dict of parameters, as returned by getShapeParameters
+        returns: class PropertyShape, NodeShape or WellFormedShape
+        """
+        if self.sh.path in parameters:
+            return PropertyShape
+        if ((shapeUri, self.rdf.type, self.sh.NodeShape) in self.g or
+                any(predicate in parameters for predicate in self.nodeShapePredicates)):
+            return NodeShape
+        return WellFormedShape
+
+    def parseReferencedShape(self, wellFormedShape, shapeUri):
+        """Parse a shape referenced by another shape and collect its errors.
+
+        args:    WellFormedShape wellFormedShape
+                 string shapeUri
+        returns: object WellFormedShape/NodeShape/PropertyShape or None for a cycle
+        """
+        if shapeUri in self.shapesInProgress:
+            wellFormedShape.errors.append(
+                ShapeCycleError('Cycle found, shape references itself:{}'.format(shapeUri))
+            )
+            return None
+
+        referencedShape = self.parseWellFormedShape(shapeUri)
+        wellFormedShape.errors += referencedShape.errors
+        return referencedShape
+
+    def parseStrings(self, wellFormedShape, values):
+        """Return all values as strings."""
+        return [self.internString(value) for value in values]
+
+    def parseTerms(self, wellFormedShape, values):
+        """Return all values unchanged."""
+        return values
+
+    def parseString(self, wellFormedShape, values):
+        """Return the first value as string."""
+        return self.internString(values[0])
+
+    def parseInteger(self, wellFormedShape, values):
+        """Return the first value as integer."""
+        return int(values[0])
+
+    def parseBoolean(self, wellFormedShape, values):
+        """Return True if the first value is the literal true."""
+        return str(values[0]).lower() == "true"
+
+    def parseLanguageMap(self, wellFormedShape, values):
+        """Return a dictionary of the values keyed by their language tag."""
+        languageMap = {}
+        for value in values:
+            if (value.language is None):
+                languageMap['default'] = self.internString(value)
             else:
-                wellFormedShape.rdfsLabel[stmt.language] = str(stmt)
+                languageMap[value.language] = self.internString(value)
+        return languageMap
 
+    def parseList(self, wellFormedShape, values):
+        """Return the members of the SHACL list given by the first value."""
         try:
-            propertyShape = PropertyShape()
-            propertyShape.fill(wellFormedShape)
-            shape = propertyShape
-        except TypeError:
-            try:
-                nodeShape = NodeShape()
-                nodeShape.fill(wellFormedShape)
-                shape = nodeShape
-            except TypeError:
-                shape = wellFormedShape
+            return list(self.listDecoder.decode(values[0]))
+        except ShaclListConstraintError:
+            # already reported by the constraint check
+            return None
+
+    def parseStringList(self, wellFormedShape, values):
+        """Return the members of the SHACL list given by the first value as strings."""
+        members = self.parseList(wellFormedShape, values)
+        if members is not None:
+            return [self.internString(member) for member in members]
+
+    def parsePropertyShapes(self, wellFormedShape, values):
+        """Parse all property shapes of a shape and collect their errors."""
+        properties = []
+        for value in values:
+            propertyShape = self.parseReferencedShape(wellFormedShape, value)
+            if propertyShape is not None:
+                self.propertyShapes[value] = propertyShape
+                properties.append(propertyShape)
+        return properties
+
+    def parseNestedShape(self, wellFormedShape, values):
+        """Parse the shape given by the first value and collect its errors."""
+        # QVS can have multiple Instances per Path, but every ProperyShape can only have 1
+        return self.parseReferencedShape(wellFormedShape, values[0])
 
-        return shape
+    def parsePropertyGroup(self, wellFormedShape, values):
+        """Return the property group given by the first value."""
+        return self.getPropertyGroup(values[0])
 
-    def getPropertyPath(self, pathUri):
-        """Parses the Propertypath.
+    def getPropertyGroup(self, groupUri):
+        """Get the property group of a group node, create it when it is first referenced.
 
-        args:    string pathUri
-        returns: dict rdfDict or list rdfList or string pathUri
+        args:    rdflib term groupUri
+        returns: PropertyGroup
         """
-        # not enforcing blank nodes here, but stripping the link nodes from the data structure
-        newPathUri = self.g.value(subject=pathUri, predicate=self.rdf.first)
-        if newPathUri is not None:
-            rdfList = []
-            rdfList.append(self.getPropertyPath(newPathUri))
-
-            if not (self.g.value(subject=pathUri, predicate=self.rdf.rest) == self.rdf.nil):
-                newPathUri = self.g.value(subject=pathUri, predicate=self.rdf.rest)
-                rest = self.getPropertyPath(newPathUri)
-                if (isinstance(rest, list)):
-                    rdfList += rest
-                else:
-                    rdfList.append(rest)
+        group = self.propertyGroups.get(groupUri)
+        if group is None:
+            parentOwner, self.parseOwner = self.parseOwner, ('group', groupUri)
+            order = self.g.value(subject=groupUri, predicate=self.sh.order)
+            labels = list(self.g.objects(groupUri, self.rdfs.label))
+            group = PropertyGroup(
+                self.internString(groupUri),
+                None if order is None else int(order),
+                self.parseLanguageMap(None, labels))
+            self.propertyGroups[groupUri] = group
+            self.parseOwner = parentOwner
+        return group
+
+    def parsePath(self, wellFormedShape, values):
+        """Parse the property path given by the first value."""
+        return self.getPropertyPath(values[0])
 
-            return rdfList
+    def getPropertyPath(self, pathUri):
+        """Parse the property path of a path node.
 
-        altPath = self.g.value(subject=pathUri, predicate=self.sh.alternativePath)
-        if altPath is not None:
-            # newPathUri = altPath
-            rdfDict = {self.sh.alternativePath: self.getPropertyPath(altPath)}
-            return rdfDict
+        The path nodes are walked iteratively, every path node is parsed once and equal paths
+        are shared.
 
-        invPath = self.g.value(subject=pathUri, predicate=self.sh.inversePath)
-        if invPath is not None:
-            rdfDict = {self.sh.inversePath: self.getPropertyPath(invPath)}
-            return rdfDict
+        args:    rdflib term pathUri
+        returns: PropertyPath or None if the path is not well-formed
+        """
+        structures = {}
+        visitingNodes = set()
+        stack = [(pathUri, False)]
+
+        # iterative post-order walk, members are parsed before the paths they belong to
+        while stack:
+            node, expanded = stack.pop()
+            if node in self.nodePaths:
+                continue
+            if not expanded:
+                if node in visitingNodes:
+                    # a path that contains itself is no well-formed path
+                    self.nodePaths[node] = None
+                    continue
+                visitingNodes.add(node)
+                parentOwner, self.parseOwner = self.parseOwner, ('path', node)
+                structures[node] = self.getPathStructure(node)
+                self.parseOwner = parentOwner
+                stack.append((node, True))
+                stack.extend((member, False) for member in reversed(structures[node][2]))
+            else:
+                visitingNodes.discard(node)
+                kind, iri, memberNodes = structures[node]
+                members = [self.nodePaths.get(member) for member in memberNodes]
+                if kind is None or None in members:
+                    self.nodePaths[node] = None
+                else:
+                    path = PropertyPath(kind, iri, members)
+                    self.nodePaths[node] = self.propertyPaths.setdefault(path, path)
 
-        zeroOrMorePath = self.g.value(subject=pathUri, predicate=self.sh.zeroOrMorePath)
-        if zeroOrMorePath is not None:
-            rdfDict = {self.sh.zeroOrMorePath: self.getPropertyPath(zeroOrMorePath)}
-            return rdfDict
+        return self.nodePaths[pathUri]
 
-        oneOrMorePath = self.g.value(subject=pathUri, predicate=self.sh.oneOrMorePath)
-        if oneOrMorePath is not None:
-            rdfDict = {self.sh.oneOrMorePath: self.getPropertyPath(oneOrMorePath)}
-            return rdfDict
+    def getPathStructure(self, pathUri):
+        """Get the kind of a path node and the nodes of its member paths.
 
-        zeroOrOnePath = self.g.value(subject=pathUri, predicate=self.sh.zeroOrOnePath)
-        if zeroOrOnePath is not None:
-            rdfDict = {self.sh.zeroOrOnePath: self.getPropertyPath(zeroOrOnePath)}
-            return rdfDict
+        args:    rdflib term pathUri
+        returns: tuple of kind, IRI and list of member nodes, the kind is None if the node is
+                 no well-formed path
+        """
+        # not enforcing blank nodes here, but stripping the link nodes from the data structure
+        if (pathUri, self.rdf.first, None) in self.g:
+            try:
+                return PropertyPath.SEQUENCE, None, self.listDecoder.decode(pathUri)
+            except ShaclListConstraintError:
+                # already reported by the constraint check
+                return None, None, []
+
+        pathParameters = {}
+        for predicate, object in self.g.predicate_objects(pathUri):
+            if predicate in self.pathKinds and predicate not in pathParameters:
+                pathParameters[predicate] = object
+
+        for predicate, kind in self.pathKinds.items():
+            if predicate in pathParameters:
+                if kind != PropertyPath.ALTERNATIVE:
+                    return kind, None, [pathParameters[predicate]]
+                try:
+                    return kind, None, self.listDecoder.decode(pathParameters[predicate])
+                except ShaclListConstraintError:
+                    return None, None, []
 
         # last Object in this Pathpart, check if its an Uri and return it
         if isinstance(pathUri, rdflib.term.URIRef):
-            return str(pathUri)
+            return PropertyPath.PREDICATE, self.internString(pathUri), []
+        return None, None, []
+
+    def internString(self, term):
+        """Get the string of a term, the same string object for every use of the term.
+
+        args:    rdflib term
+        returns: string
+        """
+        self.logParse(term)
+        string = self.internedStrings.get(term)
+        if string is None:
+            string = str(term)
+            self.internedStrings[term] = string
+            self.statistics['internedStrings'] += 1
+        else:
+            self.statistics['internedBytesSaved'] += sys.getsizeof(string)
+        return string
+
+    def logParse(self, term=None):
+        """Record a shape call or an interned term for the shape, path or group in progress.
+
+        args: rdflib term or None for a shape call
+        """
+        if self.parseLog is None:
+            return
+        entry = self.parseLog.setdefault(self.parseOwner, [0, []])
+        if term is None:
+            entry[0] += 1
+        else:
+            entry[1].append(term)
+
+
+def loadTriples(inputFilePath, streaming=False):
+    """Read the triples of a file, runs in a worker process of the ShapeParser.
+
+    args: string inputFilePath
+          boolean streaming
+    returns: list of triples
+    """
+    g = rdflib.Graph()
+    if streaming:
+        StreamingShapeLoader().load(inputFilePath, g)
+    else:
+        g.parse(inputFilePath, format='turtle')
+    return list(g)
+
+
+workerParser = None
+
+
+def initShapeParserWorker(triples, checkedErrors=None):
+    """Initialize the ShapeParser of a worker process with a copy of the graph.
+
+    args: list of triples
+          dictionary of the errors of shapes that were checked before parsing, keyed by node
+    """
+    global workerParser
+    workerParser = ShapeParser()
+    workerParser.parseLog = {}
+    if checkedErrors is not None:
+        workerParser.checkedErrors = checkedErrors
+    for triple in triples:
+        workerParser.g.add(triple)
+    workerParser.index = ShapeGraphIndex(workerParser.g)
+
+
+def parseShapesInWorker(shapeUris):
+    """Parse root shapes in a worker process.
+
+    The state is returned as one object, so shapes keep sharing their nested shapes, paths,
+    groups and strings when they are sent to the parent process.
+
+    args: list of Shape URIs
+    returns: dictionary of the parsed shapes, property shapes, paths, groups, interned strings
+             and the parse log of the worker
+    """
+    for shapeUri in shapeUris:
+        workerParser.parseWellFormedShape(shapeUri)
+    state = dict((name, getattr(workerParser, name)) for name in (
+        'parsedShapes', 'propertyShapes', 'propertyGroups', 'propertyPaths', 'nodePaths',
+        'internedStrings', 'parseLog'))
+    # a worker parses several chunks, every chunk only returns what is new
+    workerParser.parsedShapes = {}
+    workerParser.propertyShapes = {}
+    workerParser.propertyGroups = {}
+    workerParser.propertyPaths = {}
+    workerParser.nodePaths = {}
+    workerParser.internedStrings = {}
+    workerParser.parseLog = {}
+    return state
+
+
+def checkShapesInWorker(shapeUris):
+    """Check the constraints of shapes in a worker process.
+
+    args: list of Shape URIs
+    returns: list of error lists, in the order of the Shape URIs
+    """
+    # only the shapes of this worker are checked graph-wide
+    workerParser.graphCheck = GraphConstraintCheck(workerParser.g, shapeUris)
+    return [workerParser.checkShape(shapeUri) for shapeUri in shapeUris]
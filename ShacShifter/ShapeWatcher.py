@@ -0,0 +1,233 @@
+import hashlib
+import logging
+import os
+import sys
+import time
+import rdflib
+from .HTMLSerializer import HTMLSerializer
+from .RDFormsSerializer import RDFormsSerializer
+from .ShapeParser import ShapeParser
+from .modules.JsonStreamWriter import JsonStreamWriter
+
+
+class ShapeWatcher:
+    """Watches a SHACL file and shifts the shapes again whenever the file changes.
+
+    The graph and the parsed shapes of the previous version are kept. After a change only the
+    root shapes are parsed and serialized again whose own triples, or the triples of a shape
+    they depend on through sh:node, sh:property, sh:qualifiedValueShape or sh:group, changed.
+    """
+
+    logger = logging.getLogger('ShacShifter.ShapeWatcher')
+
+    def __init__(self, input, output, format, endpoint, ressourceIRI, namedGraph, interval=1.0,
+                 jsonMode=JsonStreamWriter.PRETTY, assets=HTMLSerializer.INLINE):
+        """Initialize the ShapeWatcher.
+
+        args: string input or list of strings
+              string output
+              string format
+              string endpoint
+              string ressourceIRI
+              string namedGraph
+              float interval in seconds between two checks of the input file
+              string jsonMode of the RDForms output, one of JsonStreamWriter.modes
+              string assets of the HTML output, HTMLSerializer.INLINE or HTMLSerializer.EXTERNAL
+        """
+        self.sh = rdflib.Namespace('http://www.w3.org/ns/shacl#')
+        self.dependencyPredicates = set([
+            self.sh.node, self.sh.property, self.sh.qualifiedValueShape, self.sh.group
+        ])
+        self.input = input
+        self.output = output
+        self.format = format
+        self.interval = interval
+        self.jsonMode = jsonMode
+        self.parser = None
+        self.shapes = {}
+        self.signatures = {}
+        self.serializedShapes = {}
+
+        if format == 'html':
+            self.serializer = HTMLSerializer(
+                output, endpoint, ressourceIRI, namedGraph, assets)
+        elif format == 'rdforms':
+            self.serializer = RDFormsSerializer(output, jsonMode)
+        else:
+            self.serializer = None
+
+    def watch(self):
+        """Shift the input file every time it is modified, until interrupted."""
+        lastModification = None
+        while True:
+            try:
+                modification = tuple(
+                    (inputFile, os.stat(inputFile).st_mtime_ns)
+                    for inputFile in ShapeParser().getInputFiles(self.input)
+                )
+            except OSError:
+                modification = None
+            if modification is not None and modification != lastModification:
+                lastModification = modification
+                try:
+                    self.update()
+                except Exception as e:
+                    self.logger.error('Could not shift {}: {}'.format(self.input, e))
+            time.sleep(self.interval)
+
+    def update(self):
+        """Parse the input file and serialize all root shapes that changed since the last update.
+
+        returns: list of the URIs of the changed root shapes
+        """
+        parser = ShapeParser()
+        parser.loadGraph(self.input)
+        signatures = self.getSignatures(parser.g)
+        changedNodes = set(
+            node for node in set(signatures) | set(self.signatures)
+            if signatures.get(node) != self.signatures.get(node)
+        )
+        self.logger.debug('{} shape nodes changed'.format(len(changedNodes)))
+
+        shapes = {}
+        changedShapeUris = []
+        for shapeUri in parser.getRootShapeUris():
+            key = str(shapeUri)
+            if key not in self.shapes or changedNodes & self.getDependencies(parser.g, shapeUri):
+                shapes[key] = parser.parseWellFormedShape(shapeUri)
+                changedShapeUris.append(key)
+            else:
+                shapes[key] = self.shapes[key]
+
+        self.parser = parser
+        self.shapes = shapes
+        self.signatures = signatures
+
+        if self.serializer is not None:
+            serializedShapes = {}
+            for key in shapes:
+                if key in changedShapeUris or key not in self.serializedShapes:
+                    serializedShapes[key] = self.serializeShape(shapes[key], key)
+                else:
+                    serializedShapes[key] = self.serializedShapes[key]
+            self.serializedShapes = serializedShapes
+            self.write()
+
+        self.logger.info('Shifted {} of {} shapes'.format(len(changedShapeUris), len(shapes)))
+        return changedShapeUris
+
+    def getSignatures(self, g):
+        """Get a hash of the description of every named node in the graph.
+
+        Blank nodes have no identity across two parses of a file, so the description of a named
+        node includes the descriptions of all blank nodes it references (e.g. property shapes,
+        lists and paths). Two versions of the graph differ for a named node exactly if their
+        signatures differ.
+
+        args: rdflib.Graph g
+        returns: dictionary of signatures keyed by node
+        """
+        bnodeSignatures = {}
+        signatures = {}
+        for node in set(g.subjects()):
+            if not isinstance(node, rdflib.term.BNode):
+                signatures[node] = self.getSignature(g, node, bnodeSignatures)
+        return signatures
+
+    def getSignature(self, g, node, bnodeSignatures):
+        """Get the hash of the description of a node, hash referenced blank nodes first.
+
+        args: rdflib.Graph g
+              rdflib term node
+              dictionary bnodeSignatures of the already hashed blank nodes
+        returns: string signature
+        """
+        signatures = {}
+        visiting = set()
+        stack = [(node, False)]
+
+        # iterative post-order walk, long lists must not hit the recursion limit
+        while stack:
+            current, expanded = stack.pop()
+            if current in signatures or current in bnodeSignatures:
+                continue
+            if expanded:
+                lines = []
+                for p, o in g.predicate_objects(current):
+                    if isinstance(o, rdflib.term.BNode):
+                        lines.append(p.n3() + ' ' + bnodeSignatures.get(o, '_:cycle'))
+                    else:
+                        lines.append(p.n3() + ' ' + o.n3())
+                signature = hashlib.sha1('\n'.join(sorted(lines)).encode('utf-8')).hexdigest()
+                if isinstance(current, rdflib.term.BNode):
+                    bnodeSignatures[current] = signature
+                signatures[current] = signature
+            else:
+                visiting.add(current)
+                stack.append((current, True))
+                for o in g.objects(current, None):
+                    if (isinstance(o, rdflib.term.BNode) and o not in bnodeSignatures and
+                            o not in visiting):
+                        stack.append((o, False))
+
+        return signatures.get(node, bnodeSignatures.get(node))
+
+    def getDependencies(self, g, shapeUri):
+        """Get the shape itself and all named nodes it depends on.
+
+        args: rdflib.Graph g
+              rdflib term shapeUri
+        returns: set of nodes
+        """
+        dependencies = set([shapeUri])
+        nodes = [shapeUri]
+        visitedNodes = set(nodes)
+
+        while nodes:
+            for p, o in g.predicate_objects(nodes.pop()):
+                if o in visitedNodes:
+                    continue
+                if isinstance(o, rdflib.term.BNode):
+                    visitedNodes.add(o)
+                    nodes.append(o)
+                elif isinstance(o, rdflib.term.URIRef) and p in self.dependencyPredicates:
+                    visitedNodes.add(o)
+                    dependencies.add(o)
+                    nodes.append(o)
+
+        return dependencies
+
+    def serializeShape(self, shape, key):
+        """Serialize a single root shape in the output format.
+
+        args: shape
+              string key of the shape
+        returns: string
+        """
+        if self.format == 'html':
+            return self.serializer.createForm(shape, self.shapes, key).toHTML()
+        bundle = self.serializer.createTemplateBundle(shape)
+        return JsonStreamWriter(None, self.jsonMode).encode(bundle.jsonRepr())
+
+    def write(self):
+        """Write the serialized shapes to the output file or sysout."""
+        if self.output:
+            with open(self.output, 'w') as fp:
+                self.writeShapes(fp)
+        else:
+            self.writeShapes(sys.stdout)
+
+    def writeShapes(self, fp):
+        """Write the serialized shapes to a file object.
+
+        args: file object fp
+        """
+        if self.format == 'html':
+            # the forms are cached without the assets of the page
+            self.serializer.writePage(([content] for content in self.serializedShapes.values()), fp)
+            return
+        # the cached bundles are already encoded in the mode of the writer
+        writer = JsonStreamWriter(fp, self.jsonMode)
+        for content in self.serializedShapes.values():
+            writer.writeEncoded([content])
+        writer.close()
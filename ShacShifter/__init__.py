@@ -16,7 +16,8 @@ def main(args=None):
     ch.setFormatter(formatter)
 
     parser = argparse.ArgumentParser()
-    parser.add_argument('-s', '--shacl', type=str, help="The input SHACL file")
+    parser.add_argument('-s', '--shacl', type=str, nargs='+',
+                        help="The input SHACL files, directories or glob patterns")
     parser.add_argument('-o', '--output', type=str, help="The output file")
     parser.add_argument('-f', '--format', type=str, choices=[
         'rdforms',
@@ -29,6 +30,30 @@ def main(args=None):
     parser.add_argument('-se', '--sparqlEndpoint', type=str, help="The Sparql Endpoint")
     parser.add_argument('-ri', '--resourceIRI', type=str, help="The resource IRI")
     parser.add_argument('-ng', '--namedGraph', type=str, help="The named Graph")
+    parser.add_argument('--stream', action="store_true",
+                        help="Read only the shapes of an N-Triples or N-Quads SHACL file")
+    parser.add_argument('-c', '--cacheDirectory', type=str,
+                        help="The directory to cache parsed shapes in, only use a directory "
+                             "that no other user can write to")
+    parser.add_argument('--cacheSize', type=int, default=64,
+                        help="The maximum size of the shape cache in MB")
+    parser.add_argument('-j', '--processes', type=int,
+                        help="The number of processes to parse the SHACL files with")
+    parser.add_argument('--checkProcesses', type=int,
+                        help="The number of processes to check the constraints of the shapes with")
+    parser.add_argument('--jsonMode', type=str, default='pretty', choices=[
+        'pretty',
+        'compact',
+        'jsonl'
+    ], help="Write RDForms as pretty or compact JSON array or as JSON Lines")
+    parser.add_argument('--dedup', action="store_true",
+                        help="Write every distinct RDForms template only once")
+    parser.add_argument('--assets', type=str, default='inline', choices=[
+        'inline',
+        'external'
+    ], help="Inline the script of HTML forms or write it to a file next to the output file")
+    parser.add_argument('-w', '--watch', action="store_true",
+                        help="Shift the changed shapes again whenever the SHACL file changes")
 
     args = parser.parse_args()
 
@@ -53,5 +78,11 @@ def main(args=None):
     logger.debug('Logger initialized')
 
     shifter = ShacShifter()
+    if args.watch:
+        shifter.watch(args.shacl, args.output, args.format, args.sparqlEndpoint,
+                      args.resourceIRI, args.namedGraph, args.jsonMode, args.assets)
+        return
     shifter.shift(args.shacl, args.output, args.format, args.sparqlEndpoint,
-                  args.resourceIRI, args.namedGraph)
+                  args.resourceIRI, args.namedGraph, args.stream, args.cacheDirectory,
+                  args.cacheSize * 1024 * 1024, args.processes, args.checkProcesses,
+                  args.jsonMode, args.dedup, args.assets)
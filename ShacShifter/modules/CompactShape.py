@@ -0,0 +1,93 @@
+from collections.abc import Mapping
+
+
+class EmptyList(list):
+    """An immutable empty list, shared by all shapes as value of unset list fields."""
+
+    def immutable(self, *args, **kwargs):
+        raise TypeError('Default values of shapes are shared, assign a new list instead')
+
+    append = extend = insert = remove = pop = clear = sort = reverse = immutable
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = immutable
+
+    def __reduce__(self):
+        # unpickled shapes share the default again
+        return 'EMPTY_LIST'
+
+
+class EmptyDict(dict):
+    """An immutable empty dictionary, shared by all shapes as value of unset dictionary fields."""
+
+    def immutable(self, *args, **kwargs):
+        raise TypeError('Default values of shapes are shared, assign a new dictionary instead')
+
+    __setitem__ = __delitem__ = __ior__ = immutable
+    clear = pop = popitem = setdefault = update = immutable
+
+    def __reduce__(self):
+        return 'EMPTY_DICT'
+
+
+EMPTY_LIST = EmptyList()
+EMPTY_DICT = EmptyDict()
+
+
+class ShapeFlags(Mapping):
+    """The isSet mapping of a shape, field names to booleans stored in the bitmask of the shape."""
+
+    __slots__ = ('shape',)
+
+    def __init__(self, shape):
+        self.shape = shape
+
+    def __getitem__(self, name):
+        return self.shape.setFields & self.shape.fieldBits[name] != 0
+
+    def __setitem__(self, name, value):
+        bit = self.shape.fieldBits[name]
+        if value:
+            self.shape.setFields |= bit
+        else:
+            self.shape.setFields &= ~bit
+
+    def __iter__(self):
+        return iter(self.shape.fields)
+
+    def __len__(self):
+        return len(self.shape.fields)
+
+
+class CompactShape:
+    """The base class of the shape classes.
+
+    Every field of a shape is a slot, so shapes have no per instance dictionary. Fields that
+    were never assigned are not stored, their default value is shared by all shapes of a class
+    (immutable empty lists and dictionaries for list and dictionary fields). Which fields are
+    set is stored as bitmask and accessible as shape.isSet[field].
+
+    Subclasses define their fields with default values in the ordered dictionary fields and
+    use the field names as __slots__.
+    """
+
+    __slots__ = ('setFields',)
+    fields = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.fieldBits = dict((name, 1 << i) for i, name in enumerate(cls.fields))
+
+    def __init__(self):
+        self.setFields = 0
+        # errors are appended to, so they are never shared
+        self.errors = []
+
+    def __getattr__(self, name):
+        # only called for fields that were never assigned
+        try:
+            return self.fields[name]
+        except KeyError:
+            raise AttributeError('{} has no attribute {}'.format(type(self).__name__, name))
+
+    @property
+    def isSet(self):
+        return ShapeFlags(self)
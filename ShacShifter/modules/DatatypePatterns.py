@@ -0,0 +1,33 @@
+import logging
+from XSDreg import XSDreg
+
+
+class DatatypePatterns:
+    """The regular expressions of XSD datatypes, used as patterns of HTML inputs.
+
+    The expressions are looked up once per datatype IRI and shared by the whole process, all
+    text fields with the same datatype get the same pattern string.
+    """
+
+    logger = logging.getLogger('ShacShifter.DatatypePatterns')
+    xsdReg = None
+    patterns = {}
+
+    @classmethod
+    def getPattern(cls, datatype):
+        """Get the regular expression of a datatype.
+
+        args: string datatype IRI
+        returns: string regular expression, empty if the datatype is unknown
+        """
+        pattern = cls.patterns.get(datatype)
+        if pattern is None:
+            if cls.xsdReg is None:
+                cls.xsdReg = XSDreg.XSDreg()
+            try:
+                pattern = cls.xsdReg.getRegex(datatype)
+            except KeyError:
+                cls.logger.debug('No pattern for datatype {}'.format(datatype))
+                pattern = ''
+            cls.patterns[datatype] = pattern
+        return pattern
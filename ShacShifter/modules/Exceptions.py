@@ -52,3 +52,15 @@ class MinMaxConstraintError(ConstraintError):
     """
     Thrown when min and max parts of ranges don't have min >= max
     """
+
+
+class ShapeCycleError(ParseError):
+    """
+    Thrown when a Shape references itself through sh:property or sh:qualifiedValueShape
+    """
+
+
+class ShapeConflictError(ParseError):
+    """
+    Thrown when a Shape is defined in more than one input file
+    """
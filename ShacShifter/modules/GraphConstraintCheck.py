@@ -0,0 +1,216 @@
+import rdflib
+from collections import OrderedDict
+from .Exceptions import *
+
+
+class GraphConstraintCheck:
+    """Checks the multiplicity, node kind and datatype constraints of all shapes at once.
+
+    The subjects with a checked predicate are collected in one pass over the graph. Terms are
+    encoded as integers, the node kind and datatype of every term are computed once, and the
+    objects are grouped by subject and predicate. The errors of every subject are then collected
+    in the same order as the per shape checks of WellFormedShapeConstraintCheck, which only looks
+    them up.
+    """
+
+    # node kinds of the encoded terms
+    IRI = 1
+    BLANKNODE = 2
+    LITERAL = 4
+
+    def __init__(self, graph, subjects=None):
+        """Check the shapes of a graph.
+
+        args: rdflib.Graph graph
+              list of subjects to check, all subjects of the graph are checked if it is None
+        """
+        self.sh = rdflib.Namespace('http://www.w3.org/ns/shacl#')
+        self.xsd = rdflib.Namespace('http://www.w3.org/2001/XMLSchema#')
+        self.termIds = {}
+        self.terms = []
+        self.kinds = []
+        self.datatypes = []
+        self.languages = []
+        self.nodeKinds = set([
+            self.sh.BlankNode,
+            self.sh.IRI,
+            self.sh.Literal,
+            self.sh.BlankNodeOrIRI,
+            self.sh.BlankNodeOrLiteral,
+            self.sh.IRIOrLiteral
+        ])
+        self.rules = self.getRules()
+        self.checkedPredicates = set(predicate for check, predicate, argument in self.rules)
+        # objects grouped by subject and predicate, all as term ids
+        self.groups = {}
+        self.errors = {}
+
+        if subjects is None:
+            subjects = OrderedDict()
+            for s, p, o in graph:
+                if p in self.checkedPredicates:
+                    subjects[s] = True
+        # the objects of a subject are read in the order rdflib.Graph.value uses
+        for subject in subjects:
+            self.addTriples(graph.triples((subject, None, None)))
+
+        for subjectId, predicates in self.groups.items():
+            self.errors[subjectId] = self.checkSubject(predicates)
+
+    def getRules(self):
+        """Get the checks in the order they are applied to every subject.
+
+        Checks of 'first' values only look at the first object of a predicate, the others at all
+        objects.
+
+        returns: list of tuples (check, predicate, argument)
+        """
+        rules = [('nodeKind', self.sh.targetNode, self.IRI | self.LITERAL)]
+
+        for predicate in ['targetClass', 'targetSubjectsOf', 'targetObjectsOf', 'class',
+                          'equals', 'disjoint', 'lessThan', 'lessThanOrEquals']:
+            rules.append(('nodeKind', self.sh[predicate], self.IRI))
+
+        rules.append(('firstNodeKind', self.sh.datatype, self.IRI))
+        for predicate in ['minExclusive', 'minInclusive', 'maxExclusive', 'maxInclusive',
+                          'closed']:
+            rules.append(('firstNodeKind', self.sh[predicate], self.LITERAL))
+
+        for predicate in ['ignoredProperties', 'nodekind', 'closed', 'path', 'datatype',
+                          'minCount', 'maxCount', 'minExclusive', 'minInclusive',
+                          'maxExclusive', 'maxInclusive', 'minLength', 'maxLength', 'pattern',
+                          'flags', 'uniqueLang', 'in', 'order', 'qualifiedValueShape',
+                          'qualifiedValueShapesDisjoint', 'qualifiedMinCount',
+                          'qualifiedMaxCount', 'group', 'languageIn']:
+            rules.append(('max', self.sh[predicate], None))
+
+        for predicate in ['message', 'name', 'description']:
+            rules.append(('languageOrString', self.sh[predicate], None))
+
+        for predicate, datatype in [
+                ('minCount', self.xsd.integer),
+                ('maxCount', self.xsd.integer),
+                ('minLength', self.xsd.integer),
+                ('maxLength', self.xsd.integer),
+                ('pattern', self.xsd.string),
+                ('flags', self.xsd.string),
+                ('uniqueLang', self.xsd.boolean),
+                ('qualifiedValueShapesDisjoint', self.xsd.boolean),
+                ('qualifiedMinCount', self.xsd.integer),
+                ('qualifiedMaxCount', self.xsd.integer),
+                ('closed', self.xsd.boolean)]:
+            rules.append(('firstDatatype', self.sh[predicate], datatype))
+
+        rules.append(('nodeKindIn', self.sh.nodeKind, None))
+        return rules
+
+    def addTriples(self, triples):
+        """Encode and group the triples with a checked predicate.
+
+        args: iterable of triples
+        """
+        for s, p, o in triples:
+            if p not in self.checkedPredicates:
+                continue
+            predicates = self.groups.setdefault(self.getTermId(s), {})
+            predicates.setdefault(p, []).append(self.getTermId(o))
+
+    def getTermId(self, term):
+        """Get the integer id of a term, encode the term if it is new.
+
+        args: rdflib term
+        returns: int
+        """
+        termId = self.termIds.get(term)
+        if termId is None:
+            termId = len(self.terms)
+            self.termIds[term] = termId
+            self.terms.append(term)
+            if isinstance(term, rdflib.term.Literal):
+                self.kinds.append(self.LITERAL)
+                self.languages.append(term.language)
+            elif isinstance(term, rdflib.term.BNode):
+                self.kinds.append(self.BLANKNODE)
+                self.languages.append(None)
+            else:
+                self.kinds.append(self.IRI if isinstance(term, rdflib.term.URIRef) else 0)
+                self.languages.append(None)
+            self.datatypes.append(self.getDatatype(term))
+        return termId
+
+    def getDatatype(self, term):
+        """Get the datatype of a term, xsd:string for literals without datatype and language.
+
+        See: https://www.w3.org/TR/rdf11-concepts/#section-Graph-Literal
+
+        args: rdflib term
+        returns: rdflib.term.URIRef or None
+        """
+        # the datatype check only accepts plain rdflib Literals, not subclasses
+        if type(term) is not rdflib.term.Literal:
+            return None
+        if term.datatype is None and term.language is None:
+            return self.xsd.string
+        return term.datatype
+
+    def checkSubject(self, predicates):
+        """Apply all checks to the grouped objects of a subject.
+
+        args: dictionary of lists of term ids, keyed by predicate
+        returns: list of errors
+        """
+        errors = []
+
+        for check, predicate, argument in self.rules:
+            objectIds = predicates.get(predicate)
+            if objectIds is None:
+                continue
+            if check.startswith('first'):
+                # like rdflib.Graph.value, only the first object is checked
+                objectIds = objectIds[:1]
+
+            if check == 'nodeKind' or check == 'firstNodeKind':
+                for objectId in objectIds:
+                    if not self.kinds[objectId] & argument:
+                        errors.append(NodeKindConstraintError(
+                            'Conflict found. Object has the wrong type:{}'.format(
+                                self.terms[objectId])))
+            elif check == 'max':
+                if len(objectIds) > 1:
+                    errors.append(MaxConstraintError('Conflict found for {}'.format(predicate)))
+            elif check == 'languageOrString':
+                for objectId in objectIds:
+                    if not self.kinds[objectId] & self.LITERAL:
+                        errors.append(DataTypeConstraintError(
+                            'Conflict found. Object has the wrong datatype:{}'.format(predicate)))
+                    elif self.languages[objectId] is None:
+                        self.datatypeCheck(objectId, self.xsd.string, errors)
+            elif check == 'firstDatatype':
+                self.datatypeCheck(objectIds[0], argument, errors)
+            elif check == 'nodeKindIn':
+                if self.terms[objectIds[0]] not in self.nodeKinds:
+                    errors.append(ConstraintError('Conflict found for {}'.format(predicate)))
+
+        return errors
+
+    def datatypeCheck(self, objectId, datatype, errors):
+        """Check the datatype of an encoded term.
+
+        args: int objectId
+              rdflib.term.URIRef datatype
+              list of errors
+        """
+        if self.datatypes[objectId] != datatype:
+            errors.append(DataTypeConstraintError(
+                'Conflict found. Object has the wrong datatype:{}'.format(self.terms[objectId])))
+
+    def getErrors(self, shapeUri):
+        """Get the errors of a shape.
+
+        args: rdflib term shapeUri
+        returns: list of errors
+        """
+        subjectId = self.termIds.get(shapeUri)
+        if subjectId is None:
+            return []
+        return list(self.errors.get(subjectId, ()))
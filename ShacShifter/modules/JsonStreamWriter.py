@@ -0,0 +1,69 @@
+import json
+
+
+class JsonStreamWriter:
+    """Writes JSON values one by one to a file object.
+
+    In the pretty and compact modes the values are written as the items of one JSON array, in
+    the jsonl mode as JSON Lines (one compact value per line, see: https://jsonlines.org/).
+    Values are encoded incrementally, so no complete string of the output is built. The output
+    is only valid JSON after close() was called.
+    """
+
+    PRETTY = 'pretty'
+    COMPACT = 'compact'
+    JSONL = 'jsonl'
+    modes = (PRETTY, COMPACT, JSONL)
+
+    def __init__(self, fp, mode=PRETTY):
+        """Initialize the writer.
+
+        args: file object fp
+              string mode, one of JsonStreamWriter.modes
+        """
+        if mode not in self.modes:
+            raise ValueError('Unknown JSON mode {}, use one of {}'.format(
+                mode, ', '.join(self.modes)))
+        self.fp = fp
+        self.mode = mode
+        if mode == self.PRETTY:
+            self.encoder = json.JSONEncoder(indent=4)
+        else:
+            self.encoder = json.JSONEncoder(separators=(',', ':'))
+        self.count = 0
+
+    def write(self, value):
+        """Encode a value and write it.
+
+        args: value that is serializable by the json encoder
+        """
+        self.writeEncoded(self.encoder.iterencode(value))
+
+    def writeEncoded(self, chunks):
+        """Write an already encoded value, e.g. a cached one.
+
+        args: iterable of strings that are the JSON encoding of one value in the mode of
+              this writer
+        """
+        if self.mode == self.JSONL:
+            for chunk in chunks:
+                self.fp.write(chunk)
+            self.fp.write('\n')
+        else:
+            self.fp.write(',\n' if self.count else '[\n')
+            for chunk in chunks:
+                self.fp.write(chunk)
+        self.count += 1
+
+    def encode(self, value):
+        """Encode a value in the mode of this writer, without writing it.
+
+        args: value that is serializable by the json encoder
+        returns: string
+        """
+        return self.encoder.encode(value)
+
+    def close(self):
+        """Finish the output, the file object is not closed."""
+        if self.mode != self.JSONL:
+            self.fp.write('\n]\n' if self.count else '[]\n')
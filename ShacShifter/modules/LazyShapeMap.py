@@ -0,0 +1,42 @@
+from collections.abc import Mapping
+
+
+class LazyShapeMap(Mapping):
+    """A read-only mapping of root shape URIs to shapes that parses every shape on first access.
+
+    The keys are known as soon as the graph is loaded, the shape of a key (including its
+    constraint check) is parsed when it is first looked up and kept afterwards.
+    """
+
+    def __init__(self, parser, shapeUris):
+        """Initialize the mapping.
+
+        args: ShapeParser parser with a loaded graph
+              list of root Shape URIs
+        """
+        self.parser = parser
+        self.shapeUris = dict((str(shapeUri), shapeUri) for shapeUri in shapeUris)
+        self.shapes = {}
+
+    def __getitem__(self, key):
+        if key not in self.shapes:
+            shapeUri = self.shapeUris[key]
+            self.shapes[key] = self.parser.parseRootShape(shapeUri)
+        return self.shapes[key]
+
+    def __iter__(self):
+        return iter(self.shapeUris)
+
+    def __len__(self):
+        return len(self.shapeUris)
+
+    def __contains__(self, key):
+        return key in self.shapeUris
+
+    def isParsed(self, key):
+        """Check if the shape of a key was parsed already.
+
+        args: string key
+        returns: boolean
+        """
+        return key in self.shapes
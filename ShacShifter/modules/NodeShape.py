@@ -1,38 +1,27 @@
-class NodeShape:
+from collections import OrderedDict
+from .CompactShape import CompactShape, EMPTY_DICT, EMPTY_LIST
+
+
+class NodeShape(CompactShape):
     """The NodeShape class."""
 
-    def __init__(self):
-        self.uri = ''
-        self.targetClass = []
-        self.targetNode = []
-        self.targetObjectsOf = []
-        self.targetSubjectsOf = []
-        self.nodeKind = ''
-        self.properties = []
-        self.closed = False
-        self.ignoredProperties = []
-        self.sOr = []
-        self.sNot = []
-        self.sAnd = []
-        self.sXone = []
-        self.message = {}
-        self.severity = -1
+    fields = OrderedDict([
+        ('uri', ''),
+        ('targetClass', EMPTY_LIST),
+        ('targetNode', EMPTY_LIST),
+        ('targetObjectsOf', EMPTY_LIST),
+        ('targetSubjectsOf', EMPTY_LIST),
+        ('nodeKind', ''),
+        ('properties', EMPTY_LIST),
+        ('closed', False),
+        ('ignoredProperties', EMPTY_LIST),
+        ('sOr', EMPTY_LIST),
+        ('sNot', EMPTY_LIST),
+        ('sAnd', EMPTY_LIST),
+        ('sXone', EMPTY_LIST),
+        ('message', EMPTY_DICT),
+        ('severity', -1),
         # non-shacl variable for Exceptionhandling
-        self.errors = []
-        self.isSet = {}
-        for var in vars(self):
-            if not var.startswith('__'):
-                self.isSet[var] = False
-
-    def fill(self, wellFormedShape):
-        # is check for properties necessary? without targets the nodeshape is useless
-        if not (wellFormedShape.isSet('targetClass') or
-                wellFormedShape.isSet('targetNode') or
-                wellFormedShape.isSet('targetObjectsOf') or
-                wellFormedShape.isSet('targetSubjectsOf') or
-                wellFormedShape.isSet('properties')):
-            raise TypeError('Given Shape is no NodeShape')
-        for var in vars(self):
-            if wellFormedShape.isSet[var]:
-                self.isSet[var] = True
-                setattr(self, var, getattr(wellFormedShape, var))
+        ('errors', EMPTY_LIST)
+    ])
+    __slots__ = tuple(fields)
@@ -0,0 +1,29 @@
+class PropertyGroup:
+    """A sh:PropertyGroup, see: https://www.w3.org/TR/shacl/#group
+
+    The ShapeParser creates one PropertyGroup per group IRI and shares it between all property
+    shapes of the group.
+    """
+
+    __slots__ = ('uri', 'order', 'label')
+
+    def __init__(self, uri, order=None, label=None):
+        """Initialize a PropertyGroup.
+
+        args: string uri
+              int order, None if the group has no sh:order
+              dictionary label of the rdfs:label values keyed by their language tag
+        """
+        self.uri = uri
+        self.order = order
+        self.label = {} if label is None else label
+
+    def getLabel(self):
+        """Get the label without language tag, the IRI of the group if it has none.
+
+        returns: string
+        """
+        return self.label.get('default', self.uri)
+
+    def __repr__(self):
+        return 'PropertyGroup({})'.format(self.uri)
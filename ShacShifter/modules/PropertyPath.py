@@ -0,0 +1,98 @@
+import hashlib
+
+
+class PropertyPath(tuple):
+    """An immutable SHACL property path.
+
+    A path is a predicate path with an IRI, or a sequence, alternative, inverse, zeroOrMore,
+    oneOrMore or zeroOrOne path of member paths. Paths are equal and hash equal if they have
+    the same structure, the ShapeParser creates every distinct path once and shares it.
+    The SPARQL property path and a stable id derived from it are computed when a path is
+    created, see: https://www.w3.org/TR/sparql11-query/#propertypaths
+    """
+
+    __slots__ = ()
+
+    PREDICATE = 'predicate'
+    SEQUENCE = 'sequence'
+    ALTERNATIVE = 'alternative'
+    INVERSE = 'inverse'
+    ZERO_OR_MORE = 'zeroOrMore'
+    ONE_OR_MORE = 'oneOrMore'
+    ZERO_OR_ONE = 'zeroOrOne'
+
+    modifiers = {ZERO_OR_MORE: '*', ONE_OR_MORE: '+', ZERO_OR_ONE: '?'}
+
+    def __new__(cls, kind, iri=None, members=()):
+        """Create a path.
+
+        args: string kind
+              string iri of a predicate path
+              tuple of PropertyPath members
+        """
+        members = tuple(members)
+        if kind == cls.PREDICATE:
+            sparql = '<' + iri + '>'
+        elif kind == cls.SEQUENCE:
+            sparql = '/'.join(cls.group(member, (cls.SEQUENCE, cls.ALTERNATIVE))
+                              for member in members)
+        elif kind == cls.ALTERNATIVE:
+            sparql = '|'.join(cls.group(member, (cls.ALTERNATIVE,)) for member in members)
+        elif kind == cls.INVERSE:
+            sparql = '^' + cls.group(members[0], (cls.SEQUENCE, cls.ALTERNATIVE, cls.INVERSE))
+        else:
+            # modifiers only apply to a predicate or a group
+            sparql = (members[0].sparql if members[0].kind == cls.PREDICATE else
+                      '(' + members[0].sparql + ')') + cls.modifiers[kind]
+        pathId = hashlib.sha1(sparql.encode('utf-8')).hexdigest()[:16]
+        return tuple.__new__(cls, (kind, iri, members, sparql, pathId))
+
+    def __getnewargs__(self):
+        return (self.kind, self.iri, self.members)
+
+    @staticmethod
+    def group(member, groupedKinds):
+        if member.kind in groupedKinds:
+            return '(' + member.sparql + ')'
+        return member.sparql
+
+    @property
+    def kind(self):
+        return self[0]
+
+    @property
+    def iri(self):
+        """The IRI of a predicate path, None for all other paths."""
+        return self[1]
+
+    @property
+    def members(self):
+        return self[2]
+
+    @property
+    def sparql(self):
+        return self[3]
+
+    @property
+    def id(self):
+        return self[4]
+
+    @property
+    def isPredicatePath(self):
+        return self[0] == self.PREDICATE
+
+    # the SPARQL path is unique for the structure of a path, comparing it avoids recursion
+    def __eq__(self, other):
+        return isinstance(other, PropertyPath) and self[3] == other[3]
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self[3])
+
+    def __str__(self):
+        return self.iri if self.isPredicatePath else self.sparql
+
+    def __repr__(self):
+        return 'PropertyPath({})'.format(self.sparql)
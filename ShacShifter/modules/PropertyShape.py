@@ -1,54 +1,48 @@
-class PropertyShape:
+from collections import OrderedDict
+from .CompactShape import CompactShape, EMPTY_DICT, EMPTY_LIST
+
+
+class PropertyShape(CompactShape):
     """The PropertyShape class."""
 
-    def __init__(self):
-        self.uri = ''
-        self.path = ''
-        self.classes = []
-        self.datatype = ''
-        self.name = {}
-        self.description = {}
-        self.minCount = -1
-        self.maxCount = -1
-        self.minExclusive = -1
-        self.minInclusive = -1
-        self.maxExclusive = -1
-        self.maxInclusive = -1
-        self.minLength = -1
-        self.maxLength = -1
-        self.pattern = ''
-        self.flags = ''
-        self.languageIn = []
-        self.uniqueLang = False
-        self.equals = []
-        self.disjoint = []
-        self.lessThan = []
-        self.lessThanOrEquals = []
-        self.nodes = []
-        self.qualifiedValueShape = []
-        self.qualifiedValueShapesDisjoint = []
-        self.qualifiedMinCount = []
-        self.qualifiedMaxCount = []
-        self.hasValue = []
-        self.shIn = []
-        self.order = float('inf')
-        self.group = ''
-        self.message = {}
-        self.sOr = []
-        self.sNot = []
-        self.sAnd = []
-        self.sXone = []
+    fields = OrderedDict([
+        ('uri', ''),
+        ('path', ''),
+        ('classes', EMPTY_LIST),
+        ('datatype', ''),
+        ('name', EMPTY_DICT),
+        ('description', EMPTY_DICT),
+        ('minCount', -1),
+        ('maxCount', -1),
+        ('minExclusive', -1),
+        ('minInclusive', -1),
+        ('maxExclusive', -1),
+        ('maxInclusive', -1),
+        ('minLength', -1),
+        ('maxLength', -1),
+        ('pattern', ''),
+        ('flags', ''),
+        ('languageIn', EMPTY_LIST),
+        ('uniqueLang', False),
+        ('equals', EMPTY_LIST),
+        ('disjoint', EMPTY_LIST),
+        ('lessThan', EMPTY_LIST),
+        ('lessThanOrEquals', EMPTY_LIST),
+        ('nodes', EMPTY_LIST),
+        ('qualifiedValueShape', EMPTY_LIST),
+        ('qualifiedValueShapesDisjoint', EMPTY_LIST),
+        ('qualifiedMinCount', EMPTY_LIST),
+        ('qualifiedMaxCount', EMPTY_LIST),
+        ('hasValue', EMPTY_LIST),
+        ('shIn', EMPTY_LIST),
+        ('order', float('inf')),
+        ('group', ''),
+        ('message', EMPTY_DICT),
+        ('sOr', EMPTY_LIST),
+        ('sNot', EMPTY_LIST),
+        ('sAnd', EMPTY_LIST),
+        ('sXone', EMPTY_LIST),
         # non-shacl variable for Exceptionhandling
-        self.errors = []
-        self.isSet = {}
-        for var in vars(self):
-            if not var.startswith('__'):
-                self.isSet[var] = False
-
-    def fill(self, wellFormedShape):
-        if not wellFormedShape.isSet['path']:
-            raise TypeError('Given Shape is no PropertyShape (no path)')
-        for var in vars(self):
-            if wellFormedShape.isSet[var]:
-                self.isSet[var] = True
-                setattr(self, var, getattr(wellFormedShape, var))
+        ('errors', EMPTY_LIST)
+    ])
+    __slots__ = tuple(fields)
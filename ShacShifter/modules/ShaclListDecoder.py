@@ -0,0 +1,70 @@
+import rdflib
+from .Exceptions import ShaclListConstraintError
+
+
+class ShaclListDecoder:
+    """A decoder for SHACL lists (rdf:first/rdf:rest collections) of a graph.
+
+    Lists are walked iteratively, so their length is not limited by the recursion limit.
+    Every list is checked once for loops, wrong node types and cells without exactly one
+    rdf:first and rdf:rest. It is cached by its head node, so the parser and the constraint
+    check can share the decoded members. Only the message of an error is cached, every call
+    raises a new error.
+    See: https://www.w3.org/TR/shacl/#syntax-rule-SHACL-list
+    """
+
+    def __init__(self, graph):
+        self.rdf = rdflib.Namespace('http://www.w3.org/1999/02/22-rdf-syntax-ns#')
+        self.g = graph
+        self.decodedLists = {}
+
+    def decode(self, head):
+        """Get the members of a SHACL list.
+
+        args:    rdflib.term.URIRef or rdflib.term.BNode head
+        returns: tuple of rdflib terms
+        raises:  ShaclListConstraintError if the list is no well-formed SHACL list
+        """
+        if head not in self.decodedLists:
+            self.decodedLists[head] = self.walk(head)
+
+        members, errorMessage = self.decodedLists[head]
+        if errorMessage is not None:
+            raise ShaclListConstraintError(errorMessage)
+        return members
+
+    def walk(self, head):
+        """Walk the list from its head node to rdf:nil.
+
+        args:    rdflib.term.URIRef or rdflib.term.BNode head
+        returns: tuple of the members and the message of the error or None
+        """
+        members = []
+        visitedNodes = set()
+        node = head
+
+        while node != self.rdf.nil:
+            if not isinstance(node, (rdflib.term.URIRef, rdflib.term.BNode)):
+                return tuple(members), 'Wrong Type in shacllist:{}'.format(node)
+            if node in visitedNodes:
+                return tuple(members), 'Loop in the shacllist:{}'.format(node)
+            visitedNodes.add(node)
+
+            # every cell has exactly one rdf:first and one rdf:rest
+            firsts = []
+            rests = []
+            for predicate, object in self.g.predicate_objects(node):
+                if predicate == self.rdf.first:
+                    firsts.append(object)
+                elif predicate == self.rdf.rest:
+                    rests.append(object)
+            if len(firsts) != 1:
+                return tuple(members), '{} rdf:first in the shacllist:{}'.format(
+                    'Missing' if not firsts else 'Multiple', node)
+            if len(rests) != 1:
+                return tuple(members), '{} rdf:rest in the shacllist:{}'.format(
+                    'Missing' if not rests else 'Multiple', node)
+            members.append(firsts[0])
+            node = rests[0]
+
+        return tuple(members), None
@@ -0,0 +1,115 @@
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import zlib
+
+
+class ShapeCache:
+    """An on-disk cache of parsed shapes.
+
+    Entries are keyed by the content hash of the input file, the versions of the parser and
+    rdflib and the parse mode and stored as compressed pickles. The least recently used entries
+    are removed when the cache grows beyond its maximum size.
+
+    Loading a pickle can run arbitrary code, so the cache directory must be trusted: it must
+    only be writable by the user who runs ShacShifter. The directory is created private and
+    entries that belong to another user are ignored.
+    """
+
+    logger = logging.getLogger('ShacShifter.ShapeCache')
+
+    def __init__(self, directory, maxSize=64 * 1024 * 1024):
+        """Initialize the cache.
+
+        args: string directory
+              int maxSize in bytes
+        """
+        self.directory = directory
+        self.maxSize = maxSize
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    def getKey(self, inputFilePath, *options):
+        """Get the cache key of one or more input files.
+
+        args: string inputFilePath or list of strings
+              options that change the parse result, e.g. the parser version
+        returns: string key
+        """
+        inputFiles = [inputFilePath] if isinstance(inputFilePath, str) else inputFilePath
+        contentHash = hashlib.sha256()
+        for inputFile in inputFiles:
+            fileHash = hashlib.sha256()
+            with open(inputFile, 'rb') as fp:
+                for chunk in iter(lambda: fp.read(1024 * 1024), b''):
+                    fileHash.update(chunk)
+            contentHash.update(fileHash.digest())
+        for option in options:
+            contentHash.update(('\0' + str(option)).encode('utf-8'))
+        return contentHash.hexdigest()
+
+    def getPath(self, key):
+        return os.path.join(self.directory, key + '.shapes')
+
+    def load(self, key):
+        """Load the shapes stored for a key.
+
+        args: string key
+        returns: dictionary of shapes or None if the key is not cached
+        """
+        path = self.getPath(key)
+        try:
+            with open(path, 'rb') as fp:
+                if not self.isTrusted(os.fstat(fp.fileno())):
+                    self.logger.warning('Ignoring cache entry of another user {}'.format(path))
+                    return None
+                shapes = pickle.loads(zlib.decompress(fp.read()))
+        except FileNotFoundError:
+            return None
+        except Exception:
+            self.logger.info('Ignoring broken cache entry {}'.format(path))
+            return None
+        # the modification time marks the last use of an entry
+        os.utime(path)
+        return shapes
+
+    def isTrusted(self, stat):
+        """Check if a cache entry belongs to the current user.
+
+        Systems without user ids, e.g. Windows, can't be checked.
+
+        args: os.stat_result stat of the entry
+        returns: boolean
+        """
+        if not hasattr(os, 'getuid'):
+            return True
+        return stat.st_uid == os.getuid()
+
+    def store(self, key, shapes):
+        """Store shapes for a key and remove old entries if the cache is too large.
+
+        args: string key
+              dictionary shapes
+        """
+        data = zlib.compress(pickle.dumps(shapes, pickle.HIGHEST_PROTOCOL))
+        fd, temporaryPath = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(data)
+        os.replace(temporaryPath, self.getPath(key))
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used entries until the cache fits into its maximum size."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.shapes'):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+
+        size = sum(entry[1] for entry in entries)
+        for mtime, entrySize, name in sorted(entries):
+            if size <= self.maxSize:
+                break
+            os.remove(os.path.join(self.directory, name))
+            size -= entrySize
@@ -0,0 +1,59 @@
+import rdflib
+from collections import OrderedDict
+
+
+class ShapeGraphIndex:
+    """An index of the references between the nodes of a shapes graph.
+
+    The index is built in one pass over all triples of the graph and is used to find root
+    shapes and property shapes without querying the graph for every candidate node.
+    """
+
+    def __init__(self, graph):
+        self.rdf = rdflib.Namespace('http://www.w3.org/1999/02/22-rdf-syntax-ns#')
+        self.sh = rdflib.Namespace('http://www.w3.org/ns/shacl#')
+        # ordered sets, to keep the order of the shapes stable between runs
+        self.subjects = OrderedDict()
+        self.nodeReferences = OrderedDict()
+        self.referencedNodes = set()
+        self.propertyReferences = set()
+        self.listMembers = set()
+        self.notReferences = set()
+        self.pathSubjects = set()
+
+        for s, p, o in graph:
+            self.subjects[s] = True
+            self.referencedNodes.add(o)
+            if p == self.sh.node:
+                self.nodeReferences[o] = True
+            elif p == self.sh.property:
+                self.propertyReferences.add(o)
+            elif p == self.rdf.first:
+                self.listMembers.add(o)
+            elif p == self.sh['not']:
+                self.notReferences.add(o)
+            elif p == self.sh.path:
+                self.pathSubjects.add(s)
+
+    def getRootNodes(self):
+        """Get all nodes that are not referenced by other nodes or are used with sh:node.
+
+        returns: list of rdflib terms
+        """
+        rootNodes = OrderedDict()
+
+        for node in self.subjects:
+            if node not in self.referencedNodes:
+                rootNodes[node] = True
+
+        for node in self.nodeReferences:
+            rootNodes[node] = True
+
+        return list(rootNodes)
+
+    def getPropertyShapeCandidates(self):
+        """Get all nodes with a path that are not used with sh:property, sh:not or in lists.
+
+        returns: set of rdflib terms
+        """
+        return self.pathSubjects - self.propertyReferences - self.listMembers - self.notReferences
@@ -0,0 +1,139 @@
+import codecs
+import rdflib
+from rdflib.plugins.parsers.ntriples import W3CNTriplesParser, r_wspace, r_tail
+
+
+class DocumentBNodeIds:
+    """A blank node context that maps blank node labels to document specific ids.
+
+    Unlike a dictionary it stores nothing, so the same label results in the same blank node
+    in every pass over the document without keeping all labels of a large file in memory.
+    """
+
+    def __init__(self):
+        self.prefix = str(rdflib.BNode()) + '_'
+
+    def get(self, label, default=None):
+        return self.prefix + label
+
+    def __setitem__(self, label, bnode):
+        pass
+
+
+class LineSink:
+    """A sink for the line parser that hands every triple to a callback."""
+
+    def __init__(self, callback):
+        self.triple = callback
+
+
+class QuadLineParser(W3CNTriplesParser):
+    """A line parser for N-Triples and N-Quads that drops the graph label of quads."""
+
+    def parseline(self, bnode_context=None):
+        self.eat(r_wspace)
+        if (not self.line) or self.line.startswith('#'):
+            return  # The line is empty or a comment
+
+        subject = self.subject(bnode_context)
+        self.eat(r_wspace)
+        predicate = self.predicate()
+        self.eat(r_wspace)
+        object = self.object(bnode_context)
+        self.eat(r_wspace)
+        # optional graph label of N-Quads
+        self.uriref() or self.nodeid(bnode_context)
+        self.eat(r_tail)
+
+        if self.line:
+            raise rdflib.exceptions.ParserError('Trailing garbage')
+        self.sink.triple(subject, predicate, object)
+
+
+class StreamingShapeLoader:
+    """Loads the shapes of an N-Triples or N-Quads file and discards all other triples.
+
+    The file is read line by line in several passes, so the memory needed is bounded by the
+    size of the shapes and not by the size of the file.
+    The first pass keeps triples with a SHACL predicate and rdf:type triples with a SHACL class
+    (shapes, paths and property groups). The following passes keep the rdf:first/rdf:rest
+    triples of the lists reachable from these triples and the rdfs:label triples of shapes and
+    property groups. Lists that are written in order are resolved in the second pass. A list
+    cell is complete when its rdf:first and rdf:rest triples are kept, a cell that is found after
+    one of its lines was read is completed in one more pass.
+    """
+
+    def __init__(self):
+        self.rdf = rdflib.Namespace('http://www.w3.org/1999/02/22-rdf-syntax-ns#')
+        self.sh = rdflib.Namespace('http://www.w3.org/ns/shacl#')
+        self.rdfs = rdflib.Namespace('http://www.w3.org/2000/01/rdf-schema#')
+        self.listPredicates = (self.rdf.first, self.rdf.rest)
+
+    def load(self, inputFilePath, graph):
+        """Add the shapes of a file to a graph.
+
+        args: string inputFilePath
+              rdflib.Graph graph
+        returns: rdflib.Graph graph
+        """
+        bnodeIds = DocumentBNodeIds()
+        # nodes that can be the head of a SHACL list and nodes that can have a label
+        listNodes = set()
+        labelNodes = set()
+
+        def keepShaclTriple(s, p, o):
+            if p.startswith(self.sh) or (p == self.rdf.type and o.startswith(self.sh)):
+                graph.add((s, p, o))
+                labelNodes.add(s)
+                if p == self.sh.group:
+                    labelNodes.add(o)
+                if not isinstance(o, rdflib.term.Literal) and o != self.rdf.nil:
+                    listNodes.add(o)
+
+        self.parseFile(inputFilePath, keepShaclTriple, bnodeIds)
+
+        # list cells found in the current pass, lines of them read before may have been skipped
+        foundNodes = set()
+
+        def keepListOrLabelTriple(s, p, o):
+            if p in self.listPredicates:
+                if s not in listNodes:
+                    return
+                graph.add((s, p, o))
+                # the rest of a list and nested lists of blank nodes, e.g. of sequence paths
+                if ((p == self.rdf.rest and o != self.rdf.nil) or (
+                        isinstance(o, rdflib.term.BNode) and (o, None, None) not in graph)):
+                    if o not in listNodes:
+                        listNodes.add(o)
+                        foundNodes.add(o)
+            elif p == self.rdfs.label and s in labelNodes:
+                graph.add((s, p, o))
+
+        self.parseFile(inputFilePath, keepListOrLabelTriple, bnodeIds)
+        # a cell is complete with its rdf:first and rdf:rest triple, the triples of cells that
+        # were found after they were read are kept in another pass, from its start on
+        while any(not self.isCompleteCell(graph, node) for node in foundNodes):
+            foundNodes.clear()
+            self.parseFile(inputFilePath, keepListOrLabelTriple, bnodeIds)
+
+        return graph
+
+    def isCompleteCell(self, graph, node):
+        """Check if the rdf:first and rdf:rest triple of a list cell are in the graph.
+
+        args: rdflib.Graph graph
+              rdflib term node
+        returns: boolean
+        """
+        return (node, self.rdf.first, None) in graph and (node, self.rdf.rest, None) in graph
+
+    def parseFile(self, inputFilePath, callback, bnodeIds):
+        """Read a file line by line and hand every triple to a callback.
+
+        args: string inputFilePath
+              function callback
+              DocumentBNodeIds bnodeIds
+        """
+        with open(inputFilePath, 'rb') as fp:
+            QuadLineParser(LineSink(callback)).parse(
+                codecs.getreader('utf-8')(fp), bnode_context=bnodeIds)
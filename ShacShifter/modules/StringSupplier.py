@@ -3,11 +3,13 @@
 class StringSupplier:
     """Supplier for long Strings"""
 
-    header = """<link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/flatpickr/dist/flatpickr.min.css">
+    assets = """<link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/flatpickr/dist/flatpickr.min.css">
 <script src="https://ajax.googleapis.com/ajax/libs/jquery/3.3.1/jquery.min.js"></script>
 <script src="https://cdn.jsdelivr.net/npm/flatpickr"></script>
 <script src="https://bowercdn.net/c/urijs-1.19.1/src/URI.min.js"></script>
-<form action="">
+"""
+
+    header = """<form action="" id="{id}">
 SPARQL Endpoint <br>
 <input type="text" name="endpoint" value="{}"><br>
 Ressource IRI <br>
@@ -16,31 +18,30 @@ Graph <br>
 <input type="text" name="namedGraph" value="{}"><br>"""
 
     headerTargetClassSelect = """Select Targetclass<br>
-<select id="targetClass">"""
+<select name="targetClass">"""
 
     headerTargetOption = """<option value="{target}">{target}</option>"""
 
     headerTargetClassSelectClose = """</select><br>"""
 
     headerTargetObjectsOfSelect = """Select Predicate and Subject(sh:targetObjectsOf)<br>
-<select id="targetObjectsOf">"""
+<select name="targetObjectsOf">"""
 
     headerTargetObjectsOfSelectClose ="""</select><br>
 <input type="text" name="targetObjectsOfSubject"><br>"""
 
     headerTargetSubjectsOfSelect = """Select Predicate and Object(sh:targetSubjectsOf<br>
-<select id="targetSubjectsOf">"""
+<select name="targetSubjectsOf">"""
 
     headerTargetSubjectsOfSelectClose = """</select><br>
 <input type="text" name="targetSubjectsOfObject"><br>"""
 
     submit = """<br>
-<input type="button" id="submitbutton" onclick="sendData(this.form)" value="Submit" disabled>
+<input type="button" name="submitbutton" onclick="sendData(this.form)" value="Submit" disabled>
 </form>"""
 
-    script = """
-<script>
-// not the same as date, always has the timezone part and it can only be 0
+    # the script of the forms, inlined or written to a static file
+    runtime = """// not the same as date, always has the timezone part and it can only be 0
 $(".date").flatpickr({dateFormat: "Z"});
 // no timezone atm for most types
 $(".time").flatpickr({enableTime: true, dateFormat: "H:i:S"});
@@ -174,7 +175,7 @@ function sendData(form){
                     object += "^^" + subinputs[j].parentElement.dataset.type
                 }
             }
-            triples += '<' + form.ressourceIRI.value.trim() + '> <' + inputs[i].id +
+            triples += '<' + form.ressourceIRI.value.trim() + '> <' + inputs[i].dataset.property +
                        '> ' + object + ' . ';
         }
     }
@@ -258,15 +259,22 @@ function checkCompleteValidity(form){
         }
     }
     if(allMDivsCorrect){
-        document.getElementById("submitbutton").disabled = false
+        form.elements["submitbutton"].disabled = false
     }
     else{
-        document.getElementById("submitbutton").disabled = true
+        form.elements["submitbutton"].disabled = true
     }
 }
-</script>"""
+"""
 
-    propertyMainDiv = """<div id="{}" data-min="{}" data-max="{}" data-type="{}" data-pattern="{}" data-correct="">
+    script = """
+<script>
+""" + runtime + """</script>"""
+
+    scriptReference = """
+<script src="{}"></script>"""
+
+    propertyMainDiv = """<div id="{}" data-property="{}" data-min="{}" data-max="{}" data-type="{}" data-pattern="{}" data-correct="">
 {}:<br>"""
 
     propertySubDiv = """<div id="{id}" data-correct="">
@@ -280,8 +288,8 @@ function checkCompleteValidity(form){
     propertyMainDivClose = """</div>
 <button type="button" onclick="textfieldAdd('{}')">+ {}{}</button>"""
 
-    choiceInput = """<input type="radio" name="{}" value="{}"> {}<br>"""
+    shapeReference = """<p class="shapeReference">See <a href="#{formId}">{uri}</a></p>"""
 
-    jqueryCDN = """<script src="https://ajax.googleapis.com/ajax/libs/jquery/3.3.1/jquery.min.js"></script>"""
+    choiceInput = """<input type="radio" name="{}" value="{}"> {}<br>"""
 
     datatypeLink = ' (<a href="{datatype}" target="_blank">{datatype}</a>)'
@@ -1,59 +1,61 @@
-class WellFormedShape:
+from collections import OrderedDict
+from .CompactShape import CompactShape, EMPTY_DICT, EMPTY_LIST
+
+
+class WellFormedShape(CompactShape):
     """The WellFormedShape class."""
 
-    def __init__(self):
-        self.classUri = ''
-        self.uri = ''
-        self.name = {}
-        self.description = {}
-        self.targetClass = []
-        self.targetNode = []
-        self.targetObjectsOf = []
-        self.targetSubjectsOf = []
-        self.nodeKind = ''
-        self.properties = []
-        self.defaultValue = ''
-        self.path = ''
-        self.closed = False
-        self.ignoredProperties = []
-        self.sOr = []
-        self.sNot = []
-        self.sAnd = []
-        self.sXone = []
-        self.message = {}
-        self.classes = []
-        self.datatype = ''
-        self.minCount = -1
-        self.maxCount = -1
-        self.minExclusive = -1
-        self.minInclusive = -1
-        self.maxExclusive = -1
-        self.maxInclusive = -1
-        self.minLength = -1
-        self.maxLength = -1
-        self.pattern = ''
-        self.flags = ''
-        self.languageIn = []
-        self.uniqueLang = False
-        self.equals = []
-        self.disjoint = []
-        self.lessThan = []
-        self.lessThanOrEquals = []
-        self.nodes = []
-        self.qualifiedValueShape = []
-        self.qualifiedValueShapesDisjoint = []
-        self.qualifiedMinCount = []
-        self.qualifiedMaxCount = []
-        self.hasValue = []
-        self.shIn = []
-        self.order = float('inf')
-        self.group = ''
-        # at the moment only handled for groups
-        self.rdfsLabel = {}
-        self.severity = -1
+    fields = OrderedDict([
+        ('classUri', ''),
+        ('uri', ''),
+        ('name', EMPTY_DICT),
+        ('description', EMPTY_DICT),
+        ('targetClass', EMPTY_LIST),
+        ('targetNode', EMPTY_LIST),
+        ('targetObjectsOf', EMPTY_LIST),
+        ('targetSubjectsOf', EMPTY_LIST),
+        ('nodeKind', ''),
+        ('properties', EMPTY_LIST),
+        ('defaultValue', ''),
+        ('path', ''),
+        ('closed', False),
+        ('ignoredProperties', EMPTY_LIST),
+        ('sOr', EMPTY_LIST),
+        ('sNot', EMPTY_LIST),
+        ('sAnd', EMPTY_LIST),
+        ('sXone', EMPTY_LIST),
+        ('message', EMPTY_DICT),
+        ('classes', EMPTY_LIST),
+        ('datatype', ''),
+        ('minCount', -1),
+        ('maxCount', -1),
+        ('minExclusive', -1),
+        ('minInclusive', -1),
+        ('maxExclusive', -1),
+        ('maxInclusive', -1),
+        ('minLength', -1),
+        ('maxLength', -1),
+        ('pattern', ''),
+        ('flags', ''),
+        ('languageIn', EMPTY_LIST),
+        ('uniqueLang', False),
+        ('equals', EMPTY_LIST),
+        ('disjoint', EMPTY_LIST),
+        ('lessThan', EMPTY_LIST),
+        ('lessThanOrEquals', EMPTY_LIST),
+        ('nodes', EMPTY_LIST),
+        ('qualifiedValueShape', EMPTY_LIST),
+        ('qualifiedValueShapesDisjoint', EMPTY_LIST),
+        ('qualifiedMinCount', EMPTY_LIST),
+        ('qualifiedMaxCount', EMPTY_LIST),
+        ('hasValue', EMPTY_LIST),
+        ('shIn', EMPTY_LIST),
+        ('order', float('inf')),
+        ('group', ''),
+        # the labels of property groups are kept in their PropertyGroup
+        ('rdfsLabel', EMPTY_DICT),
+        ('severity', -1),
         # non-shacl variable for Exceptionhandling
-        self.errors = []
-        self.isSet = {}
-        for var in vars(self):
-            if not var.startswith('__'):
-                self.isSet[var] = False
+        ('errors', EMPTY_LIST)
+    ])
+    __slots__ = tuple(fields)
@@ -1,11 +1,12 @@
 import logging
 import rdflib
-from rdflib.exceptions import UniquenessError
 from .WellFormedShape import WellFormedShape
 from .NodeShape import NodeShape
 from .PropertyShape import PropertyShape
 from .Exceptions import *
 from .NodeKindType import NodeKindType
+from .ShaclListDecoder import ShaclListDecoder
+from .GraphConstraintCheck import GraphConstraintCheck
 
 
 class WellFormedShapeConstraintCheck:
@@ -65,12 +66,18 @@ class WellFormedShapeConstraintCheck:
         https://www.w3.org/TR/shacl/#syntax-rule-shapesGraph-nodeKind
     """
 
-    def __init__(self, graph, shapeUri):
+    def __init__(self, graph, shapeUri, listDecoder=None, graphCheck=None):
         self.rdf = rdflib.Namespace('http://www.w3.org/1999/02/22-rdf-syntax-ns#')
         self.sh = rdflib.Namespace('http://www.w3.org/ns/shacl#')
         self.xsd = rdflib.Namespace('http://www.w3.org/2001/XMLSchema#')
         self.g = graph
         self.shapeUri = shapeUri
+        # lists can be shared with the ShapeParser, to decode every list only once
+        self.listDecoder = ShaclListDecoder(graph) if listDecoder is None else listDecoder
+        # the checks of all shapes can be shared, otherwise only this shape is checked
+        if graphCheck is None:
+            graphCheck = GraphConstraintCheck(graph, [shapeUri])
+        self.graphCheck = graphCheck
         self.errors = list()
         self.checkConstraints()
 
@@ -80,32 +87,17 @@ class WellFormedShapeConstraintCheck:
         args:    rdflib.term.URIRef or rdflib.term.BNode listUri
         returns: None
         """
-        shaclList = list()
-        uri = listUri
-        lastListEntry = False
+        try:
+            members = self.listDecoder.decode(listUri)
+        except ShaclListConstraintError as error:
+            self.errors.append(error)
+            return False  # critical error for this Shape
 
-        while not lastListEntry:
-            if not (isinstance(uri, rdflib.term.URIRef) or isinstance(uri, rdflib.term.BNode)):
-                self.errors.append(
-                    ShaclListConstraintError('Wrong Type in shacllist:{}'.format(uri))
-                )
-                return False  # critical error for this Shape
-            if uri in shaclList:
-                self.errors.append(
-                    ShaclListConstraintError('Loop in the shacllist:{}'.format(uri))
-                )
-                return False  # critical error for this Shape
-            shaclList.append(uri)
+        for member in members:
             if nodeKindType is not None:
-                val = self.g.value(subject=uri, predicate=self.rdf.first)
-                self.nodeKindConstraint(val, nodeKindType)
+                self.nodeKindConstraint(member, nodeKindType)
             if datatype is not None:
-                val = self.g.value(subject=uri, predicate=self.rdf.first)
-                self.datatypeConstraint(val, datatype)
-            # check if this was the last entry in the list
-            if self.g.value(subject=uri, predicate=self.rdf.rest) == self.rdf.nil:
-                lastListEntry = True
-            uri = self.g.value(subject=uri, predicate=self.rdf.rest)
+                self.datatypeConstraint(member, datatype)
 
     def nodeKindConstraint(self, object, nodeKindType):
         """Checks for the nodekind Constraints.
@@ -138,7 +130,11 @@ class WellFormedShapeConstraintCheck:
         returns: None
         """
         if type(object) is rdflib.term.Literal:
-            if object.datatype != datatype:
+            # literals without datatype and language are xsd:string literals
+            objectDatatype = object.datatype
+            if objectDatatype is None and object.language is None:
+                objectDatatype = self.xsd.string
+            if objectDatatype != datatype:
                 self.errors.append(DataTypeConstraintError(
                     'Conflict found. Object has the wrong datatype:{}'.format(object))
                 )
@@ -147,232 +143,56 @@ class WellFormedShapeConstraintCheck:
                 'Conflict found. Object has the wrong datatype:{}'.format(object))
             )
 
-    def maxConstraint(self):
-        """Checks for the max Constraints.
-
-        args:    None
-        returns: None
-        """
-        try:
-            val = self.g.value(
-                subject=self.shapeUri, predicate=self.sh.ignoredProperties, any=False
-            )
-        except UniquenessError:
-            self.errors.append(MaxConstraintError(
-                'Conflict found for {}'.format(self.sh.ignoredProperties))
-            )
-
-        try:
-            val = self.g.value(subject=self.shapeUri, predicate=self.sh.nodekind, any=False)
-        except UniquenessError:
-            self.errors.append(MaxConstraintError(
-                'Conflict found for {}'.format(self.sh.nodekind))
-            )
-
-        try:
-            val = self.g.value(subject=self.shapeUri, predicate=self.sh.closed, any=False)
-        except UniquenessError:
-            self.errors.append(MaxConstraintError('Conflict found for {}'.format(self.sh.closed)))
-
-        try:
-            val = self.g.value(subject=self.shapeUri, predicate=self.sh.path, any=False)
-        except UniquenessError:
-            self.errors.append(MaxConstraintError('Conflict found for {}'.format(self.sh.path)))
-
-        try:
-            val = self.g.value(subject=self.shapeUri, predicate=self.sh.datatype, any=False)
-        except UniquenessError:
-            self.errors.append(MaxConstraintError(
-                'Conflict found for {}'.format(self.sh.datatype))
-            )
-
-        try:
-            val = self.g.value(subject=self.shapeUri, predicate=self.sh.minCount, any=False)
-        except UniquenessError:
-            self.errors.append(MaxConstraintError(
-                'Conflict found for {}'.format(self.sh.minCount))
-            )
-
-        try:
-            val = self.g.value(subject=self.shapeUri, predicate=self.sh.maxCount, any=False)
-        except UniquenessError:
-            self.errors.append(MaxConstraintError(
-                'Conflict found for {}'.format(self.sh.maxCount))
-            )
-
-        try:
-            val = self.g.value(subject=self.shapeUri, predicate=self.sh.minExclusive, any=False)
-        except UniquenessError:
-            self.errors.append(MaxConstraintError(
-                'Conflict found for {}'.format(self.sh.minExclusive))
-            )
-
-        try:
-            val = self.g.value(subject=self.shapeUri, predicate=self.sh.minInclusive, any=False)
-        except UniquenessError:
-            self.errors.append(MaxConstraintError(
-                'Conflict found for {}'.format(self.sh.minInclusive))
-            )
-
-        try:
-            val = self.g.value(subject=self.shapeUri, predicate=self.sh.maxExclusive, any=False)
-        except UniquenessError:
-            self.errors.append(MaxConstraintError(
-                'Conflict found for {}'.format(self.sh.maxExclusive))
-            )
-
-        try:
-            val = self.g.value(subject=self.shapeUri, predicate=self.sh.maxInclusive, any=False)
-        except UniquenessError:
-            self.errors.append(MaxConstraintError(
-                'Conflict found for {}'.format(self.sh.maxInclusive))
-            )
-
-        try:
-            val = self.g.value(subject=self.shapeUri, predicate=self.sh.minLength, any=False)
-        except UniquenessError:
-            self.errors.append(MaxConstraintError(
-                'Conflict found for {}'.format(self.sh.minLength))
-            )
-
-        try:
-            val = self.g.value(subject=self.shapeUri, predicate=self.sh.maxLength, any=False)
-        except UniquenessError:
-            self.errors.append(MaxConstraintError(
-                'Conflict found for {}'.format(self.sh.maxLength))
-            )
-
-        try:
-            val = self.g.value(subject=self.shapeUri, predicate=self.sh.pattern, any=False)
-        except UniquenessError:
-            self.errors.append(MaxConstraintError('Conflict found for {}'.format(self.sh.pattern)))
-
-        try:
-            val = self.g.value(subject=self.shapeUri, predicate=self.sh.flags, any=False)
-        except UniquenessError:
-            self.errors.append(MaxConstraintError('Conflict found for {}'.format(self.sh.flags)))
-
-        try:
-            val = self.g.value(subject=self.shapeUri, predicate=self.sh.uniqueLang, any=False)
-        except UniquenessError:
-            self.errors.append(MaxConstraintError(
-                'Conflict found for {}'.format(self.sh.uniqueLang))
-            )
-
-        try:
-            val = self.g.value(subject=self.shapeUri, predicate=self.sh['in'], any=False)
-        except UniquenessError:
-            self.errors.append(MaxConstraintError('Conflict found for {}'.format(self.sh['in'])))
-
-        try:
-            val = self.g.value(subject=self.shapeUri, predicate=self.sh.order, any=False)
-        except UniquenessError:
-            self.errors.append(MaxConstraintError('Conflict found for {}'.format(self.sh.order)))
-
-        try:
-            val = self.g.value(
-                subject=self.shapeUri, predicate=self.sh.qualifiedValueShape, any=False
-            )
-        except UniquenessError:
-            self.errors.append(MaxConstraintError(
-                'Conflict found for {}'.format(self.sh.qualifiedValueShape))
-            )
-
-        try:
-            val = self.g.value(
-                subject=self.shapeUri,
-                predicate=self.sh.qualifiedValueShapesDisjoint,
-                any=False
-            )
-        except UniquenessError:
-            self.errors.append(MaxConstraintError(
-                'Conflict found for {}'.format(self.sh.qualifiedValueShapesDisjoint))
-            )
-
-        try:
-            val = self.g.value(
-                subject=self.shapeUri, predicate=self.sh.qualifiedMinCount, any=False
-            )
-        except UniquenessError:
-            self.errors.append(MaxConstraintError(
-                'Conflict found for {}'.format(self.sh.qualifiedMinCount))
-            )
-
-        try:
-            val = self.g.value(
-                subject=self.shapeUri, predicate=self.sh.qualifiedMaxCount, any=False
-            )
-        except UniquenessError:
-            self.errors.append(MaxConstraintError(
-                'Conflict found for {}'.format(self.sh.qualifiedMaxCount))
-            )
-
-        try:
-            val = self.g.value(subject=self.shapeUri, predicate=self.sh.group, any=False)
-        except UniquenessError:
-            self.errors.append(MaxConstraintError('Conflict found for {}'.format(self.sh.group)))
-
-        try:
-            val = self.g.value(subject=self.shapeUri, predicate=self.sh.languageIn, any=False)
-        except UniquenessError:
-            self.errors.append(MaxConstraintError(
-                'Conflict found for {}'.format(self.sh.languageIn))
-            )
-
     def propertyPathConstraints(self, pathUri):
         """Checks the Propertypath.
 
+        The path nodes are walked iteratively, so deep paths don't exceed the recursion limit.
+        Every path node is checked once, a path that contains itself is reported as error.
+
         args:    string pathUri
-        returns: dict rdfDict or list rdfList or string pathUri
+        returns: None
         """
-        # not enforcing blank nodes here, but stripping the link nodes from the data structure
-        newPathUri = self.g.value(subject=pathUri, predicate=self.rdf.first)
-        if newPathUri is not None:
-            rdfList = []
-            rdfList.append(self.propertyPathConstraints(newPathUri))
-
-            if not (self.g.value(subject=pathUri, predicate=self.rdf.rest) == self.rdf.nil):
-                self.shaclListConstraint(pathUri)
-                newPathUri = self.g.value(subject=pathUri, predicate=self.rdf.rest)
-                rest = self.propertyPathConstraints(newPathUri)
-                if (isinstance(rest, list)):
-                    rdfList += rest
-                else:
-                    rdfList.append(rest)
-
-            return rdfList
-
-        altPath = self.g.value(subject=pathUri, predicate=self.sh.alternativePath)
-        if altPath is not None:
-            # newPathUri = altPath
-            rdfDict = {self.sh.alternativePath: self.propertyPathConstraints(altPath)}
-            return rdfDict
-
-        invPath = self.g.value(subject=pathUri, predicate=self.sh.inversePath)
-        if invPath is not None:
-            rdfDict = {self.sh.inversePath: self.propertyPathConstraints(invPath)}
-            return rdfDict
-
-        zeroOrMorePath = self.g.value(subject=pathUri, predicate=self.sh.zeroOrMorePath)
-        if zeroOrMorePath is not None:
-            rdfDict = {self.sh.zeroOrMorePath: self.propertyPathConstraints(zeroOrMorePath)}
-            return rdfDict
-
-        oneOrMorePath = self.g.value(subject=pathUri, predicate=self.sh.oneOrMorePath)
-        if oneOrMorePath is not None:
-            rdfDict = {self.sh.oneOrMorePath: self.propertyPathConstraints(oneOrMorePath)}
-            return rdfDict
-
-        zeroOrOnePath = self.g.value(subject=pathUri, predicate=self.sh.zeroOrOnePath)
-        if zeroOrOnePath is not None:
-            rdfDict = {self.sh.zeroOrOnePath: self.propertyPathConstraints(zeroOrOnePath)}
-            return rdfDict
-
-        # last Object in this Pathpart, check if its an Uri and return it
-        if isinstance(pathUri, rdflib.term.URIRef):
-            return str(pathUri)
-        else:
-            self.errors.append(PathError('Object of sh:path is no URI:{}'.format(pathUri)))
+        pathPredicates = [
+            self.sh.alternativePath, self.sh.inversePath, self.sh.zeroOrMorePath,
+            self.sh.oneOrMorePath, self.sh.zeroOrOnePath
+        ]
+        checkedNodes = set()
+        visitingNodes = set()
+        stack = [(pathUri, False)]
+
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                visitingNodes.discard(node)
+                checkedNodes.add(node)
+                continue
+            if node in visitingNodes:
+                self.errors.append(PathError('Cycle found, path contains itself:{}'.format(node)))
+                continue
+            if node in checkedNodes:
+                continue
+            visitingNodes.add(node)
+            stack.append((node, True))
+
+            # not enforcing blank nodes here, but stripping the link nodes from the data structure
+            if (node, self.rdf.first, None) in self.g:
+                try:
+                    members = self.listDecoder.decode(node)
+                except ShaclListConstraintError as error:
+                    self.errors.append(error)
+                    continue
+                stack.extend((member, False) for member in reversed(members))
+                continue
+
+            for predicate in pathPredicates:
+                member = self.g.value(subject=node, predicate=predicate)
+                if member is not None:
+                    stack.append((member, False))
+                    break
+            else:
+                # last Object in this Pathpart, check if its an Uri
+                if not isinstance(node, rdflib.term.URIRef):
+                    self.errors.append(PathError('Object of sh:path is no URI:{}'.format(node)))
 
     def checkConstraints(self):
         """Checks for the nodekind Constraints
@@ -402,153 +222,8 @@ class WellFormedShapeConstraintCheck:
         if val is not None:
             self.shaclListConstraint(val, None, None)
 
-        # node kind constraints with multiple values:
-        for stmt in self.g.objects(self.shapeUri, self.sh.targetNode):
-            self.nodeKindConstraint(stmt, NodeKindType(True, False, True))
-
-        for stmt in self.g.objects(self.shapeUri, self.sh.targetClass):
-            self.nodeKindConstraint(stmt, NodeKindType(True, False, False))
-
-        for stmt in self.g.objects(self.shapeUri, self.sh.targetSubjectsOf):
-            self.nodeKindConstraint(stmt, NodeKindType(True, False, False))
-
-        for stmt in self.g.objects(self.shapeUri, self.sh.targetObjectsOf):
-            self.nodeKindConstraint(stmt, NodeKindType(True, False, False))
-
-        for stmt in self.g.objects(self.shapeUri, self.sh['class']):
-            self.nodeKindConstraint(stmt, NodeKindType(True, False, False))
-
-        for stmt in self.g.objects(self.shapeUri, self.sh.equals):
-            self.nodeKindConstraint(stmt, NodeKindType(True, False, False))
-
-        for stmt in self.g.objects(self.shapeUri, self.sh.disjoint):
-            self.nodeKindConstraint(stmt, NodeKindType(True, False, False))
-
-        for stmt in self.g.objects(self.shapeUri, self.sh.lessThan):
-            self.nodeKindConstraint(stmt, NodeKindType(True, False, False))
-
-        for stmt in self.g.objects(self.shapeUri, self.sh.lessThanOrEquals):
-            self.nodeKindConstraint(stmt, NodeKindType(True, False, False))
-
-        # node kind constraints with single values
-        val = self.g.value(subject=self.shapeUri, predicate=self.sh.datatype)
-        if val is not None:
-            self.nodeKindConstraint(val, NodeKindType(True, False, False))
-
-        val = self.g.value(subject=self.shapeUri, predicate=self.sh.minExclusive)
-        if val is not None:
-            self.nodeKindConstraint(val, NodeKindType(False, False, True))
-
-        val = self.g.value(subject=self.shapeUri, predicate=self.sh.minInclusive)
-        if val is not None:
-            self.nodeKindConstraint(val, NodeKindType(False, False, True))
-
-        val = self.g.value(subject=self.shapeUri, predicate=self.sh.maxExclusive)
-        if val is not None:
-            self.nodeKindConstraint(val, NodeKindType(False, False, True))
-
-        val = self.g.value(subject=self.shapeUri, predicate=self.sh.maxInclusive)
-        if val is not None:
-            self.nodeKindConstraint(val, NodeKindType(False, False, True))
-
-        val = self.g.value(subject=self.shapeUri, predicate=self.sh.closed)
-        if val is not None:
-            self.nodeKindConstraint(val, NodeKindType(False, False, True))
-
-        # max constraints
-        self.maxConstraint()
-
-        # datatype constraints with multiple values:
-        for stmt in self.g.objects(self.shapeUri, self.sh.message):
-            try:
-                # language attribute only exists for Literals
-                if stmt.language is None:
-                    self.datatypeConstraint(stmt, self.xsd.string)
-            except AttributeError:
-                self.errors.append(DataTypeConstraintError(
-                    'Conflict found. Object has the wrong datatype:{}'.format(self.sh.message))
-                )
-
-        for stmt in self.g.objects(self.shapeUri, self.sh.name):
-            try:
-                # language attribute only exists for Literals
-                if stmt.language is None:
-                    self.datatypeConstraint(stmt, self.xsd.string)
-            except AttributeError:
-                self.errors.append(DataTypeConstraintError(
-                    'Conflict found. Object has the wrong datatype:{}'.format(self.sh.name))
-                )
-
-        for stmt in self.g.objects(self.shapeUri, self.sh.description):
-            try:
-                # language attribute only exists for Literals
-                if stmt.language is None:
-                    self.datatypeConstraint(stmt, self.xsd.string)
-            except AttributeError:
-                self.errors.append(DataTypeConstraintError(
-                    'Conflict found. Object has the wrong datatype:{}'.format(self.sh.description))
-                )
-
-        # datatype constraints with single values:
-        val = self.g.value(subject=self.shapeUri, predicate=self.sh.minCount)
-        if val is not None:
-            self.datatypeConstraint(val, self.xsd.integer)
-
-        val = self.g.value(subject=self.shapeUri, predicate=self.sh.maxCount)
-        if val is not None:
-            self.datatypeConstraint(val, self.xsd.integer)
-
-        val = self.g.value(subject=self.shapeUri, predicate=self.sh.minLength)
-        if val is not None:
-            self.datatypeConstraint(val, self.xsd.integer)
-
-        val = self.g.value(subject=self.shapeUri, predicate=self.sh.maxLength)
-        if val is not None:
-            self.datatypeConstraint(val, self.xsd.integer)
-
-        val = self.g.value(subject=self.shapeUri, predicate=self.sh.pattern)
-        if val is not None:
-            self.datatypeConstraint(val, self.xsd.string)
-
-        val = self.g.value(subject=self.shapeUri, predicate=self.sh.flags)
-        if val is not None:
-            self.datatypeConstraint(val, self.xsd.string)
-
-        val = self.g.value(subject=self.shapeUri, predicate=self.sh.uniqueLang)
-        if val is not None:
-            self.datatypeConstraint(val, self.xsd.boolean)
-
-        val = self.g.value(subject=self.shapeUri, predicate=self.sh.qualifiedValueShapesDisjoint)
-        if val is not None:
-            self.datatypeConstraint(val, self.xsd.boolean)
-
-        val = self.g.value(subject=self.shapeUri, predicate=self.sh.qualifiedMinCount)
-        if val is not None:
-            self.datatypeConstraint(val, self.xsd.integer)
-
-        val = self.g.value(subject=self.shapeUri, predicate=self.sh.qualifiedMaxCount)
-        if val is not None:
-            self.datatypeConstraint(val, self.xsd.integer)
-
-        val = self.g.value(subject=self.shapeUri, predicate=self.sh.closed)
-        if val is not None:
-            self.datatypeConstraint(val, self.xsd.boolean)
-
-        # nodekind-in constraint
-        val = self.g.value(subject=self.shapeUri, predicate=self.sh.nodeKind)
-        if val is not None:
-            nodeKinds = [
-                self.sh.BlankNode,
-                self.sh.IRI,
-                self.sh.Literal,
-                self.sh.BlankNodeOrIRI,
-                self.sh.BlankNodeOrLiteral,
-                self.sh.IRIOrLiteral
-            ]
-            if val not in nodeKinds:
-                self.errors.append(ConstraintError(
-                    'Conflict found for {}'.format(self.sh.nodeKind))
-                )
+        # node kind, multiplicity and datatype constraints are checked for the whole graph
+        self.errors += self.graphCheck.getErrors(self.shapeUri)
 
         val = self.g.value(subject=self.shapeUri, predicate=self.sh.path)
         if val is not None:
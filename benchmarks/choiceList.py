@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Measure the RDForms serialization of property shapes with large sh:in lists.
+
+The time to create the choices of a synthetic sh:in list, the time to encode the template as
+JSON and the size of the JSON are reported for every list length.
+
+usage: python benchmarks/choiceList.py [list lengths]
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ShacShifter.RDFormsSerializer import RDFormsSerializer
+from ShacShifter.modules.PropertyShape import PropertyShape
+from ShacShifter.modules.PropertyPath import PropertyPath
+
+
+def createShape(numberOfChoices):
+    """Create a property shape with a sh:in list of numberOfChoices codes."""
+    shape = PropertyShape()
+    shape.path = PropertyPath(PropertyPath.PREDICATE, 'http://www.example.org/code')
+    shape.isSet['path'] = True
+    shape.shIn = ['http://www.example.org/code/' + str(i) for i in range(numberOfChoices)]
+    shape.isSet['shIn'] = True
+    return shape
+
+
+def measure(numberOfChoices):
+    serializer = RDFormsSerializer()
+    shape = createShape(numberOfChoices)
+    start = time.perf_counter()
+    template = serializer.getTemplate(shape)
+    created = time.perf_counter()
+    content = json.dumps(template.jsonRepr())
+    encoded = time.perf_counter()
+    return created - start, encoded - created, len(content)
+
+
+def main():
+    lengths = [int(arg) for arg in sys.argv[1:]] or [10, 1000, 50000]
+
+    print('{:>10}{:>14}{:>14}{:>14}'.format('choices', 'create [s]', 'encode [s]', 'bytes'))
+    for numberOfChoices in lengths:
+        createTime, encodeTime, size = measure(numberOfChoices)
+        print('{:>10}{:>14.4f}{:>14.4f}{:>14}'.format(
+            numberOfChoices, createTime, encodeTime, size))
+
+
+if __name__ == '__main__':
+    main()
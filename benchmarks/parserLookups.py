@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Compare per-parameter graph lookups with the single-pass parameter scan of the ShapeParser.
+
+usage: python benchmarks/parserLookups.py [number of node shapes]
+"""
+
+import os
+import sys
+import time
+import rdflib
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ShacShifter.ShapeParser import ShapeParser
+
+
+class CountingGraph(rdflib.Graph):
+    """A Graph that counts the triple pattern lookups made against it."""
+
+    lookups = 0
+
+    def triples(self, triple):
+        self.lookups += 1
+        return super().triples(triple)
+
+
+def createShapesGraph(numberOfShapes):
+    """Create a graph with node shapes that have three property shapes each."""
+    ex = rdflib.Namespace('http://www.example.org/')
+    sh = rdflib.Namespace('http://www.w3.org/ns/shacl#')
+    xsd = rdflib.Namespace('http://www.w3.org/2001/XMLSchema#')
+    g = CountingGraph()
+
+    for i in range(numberOfShapes):
+        nodeShape = ex['Shape' + str(i)]
+        g.add((nodeShape, rdflib.RDF.type, sh.NodeShape))
+        g.add((nodeShape, sh.targetClass, ex['Class' + str(i)]))
+        for j in range(3):
+            propertyShape = rdflib.BNode()
+            g.add((nodeShape, sh.property, propertyShape))
+            g.add((propertyShape, sh.path, ex['property' + str(j)]))
+            g.add((propertyShape, sh.datatype, xsd.string))
+            g.add((propertyShape, sh.minCount, rdflib.Literal(1)))
+            g.add((propertyShape, sh.name, rdflib.Literal('Property ' + str(j))))
+
+    return g
+
+
+def measure(g, shapeNodes, extract):
+    g.lookups = 0
+    start = time.perf_counter()
+    for shapeNode in shapeNodes:
+        extract(shapeNode)
+    return g.lookups, time.perf_counter() - start
+
+
+def main():
+    numberOfShapes = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    parser = ShapeParser()
+    parser.g = createShapesGraph(numberOfShapes)
+    shapeNodes = set(parser.g.subjects())
+
+    def perParameter(shapeNode):
+        for predicate in parser.parameterHandlers:
+            list(parser.g.objects(shapeNode, predicate))
+
+    results = [
+        ('per parameter lookups', measure(parser.g, shapeNodes, perParameter)),
+        ('single pass scan', measure(parser.g, shapeNodes, parser.getShapeParameters))
+    ]
+
+    print('{} shape nodes, {} triples'.format(len(shapeNodes), len(parser.g)))
+    for name, (lookups, seconds) in results:
+        print('{:<24}{:>10} lookups{:>10.3f} s'.format(name, lookups, seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Measure the memory of the shape model in bytes per shape.
+
+The shapes are filled like the ShapeParser fills them, with the fields of a typical property
+shape. Every shape class is compared with the model before the slots: an instance dictionary
+with a new list or dictionary for every list or dictionary field and an isSet dictionary.
+
+usage: python benchmarks/shapeMemory.py [number of shapes]
+"""
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ShacShifter.modules.NodeShape import NodeShape
+from ShacShifter.modules.PropertyShape import PropertyShape
+from ShacShifter.modules.WellFormedShape import WellFormedShape
+
+
+def getDictShapeClass(shapeClass):
+    """Get a class with the fields of a shape class, stored like before the slots."""
+    class DictShape:
+        def __init__(self):
+            for name, default in shapeClass.fields.items():
+                if isinstance(default, list):
+                    default = list(default)
+                elif isinstance(default, dict):
+                    default = dict(default)
+                setattr(self, name, default)
+            self.isSet = dict((name, False) for name in shapeClass.fields)
+
+    return DictShape
+
+
+def createShape(shapeClass, i):
+    """Create a shape with a path, a datatype, a minimal count and a name."""
+    shape = shapeClass()
+    values = [
+        ('path', 'http://www.example.org/property' + str(i)),
+        ('datatype', 'http://www.w3.org/2001/XMLSchema#string'),
+        ('minCount', 1),
+        ('name', {'default': 'Property'})
+    ]
+    for attribute, value in values:
+        if attribute in shape.isSet:
+            shape.isSet[attribute] = True
+            setattr(shape, attribute, value)
+    return shape
+
+
+def measure(shapeClass, numberOfShapes):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    shapes = [createShape(shapeClass, i) for i in range(numberOfShapes)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # the path strings are part of the input, not of the shape model
+    pathSize = sum(sys.getsizeof(shape.path) for shape in shapes if shape.isSet.get('path'))
+    return (after - before - pathSize) / len(shapes)
+
+
+def main():
+    numberOfShapes = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    print('{} shapes, bytes per shape'.format(numberOfShapes))
+    print('{:<24}{:>10}{:>10}{:>10}'.format('', 'baseline', 'slots', 'saved'))
+    for shapeClass in [WellFormedShape, PropertyShape, NodeShape]:
+        baseline = measure(getDictShapeClass(shapeClass), numberOfShapes)
+        compact = measure(shapeClass, numberOfShapes)
+        print('{:<24}{:>10.0f}{:>10.0f}{:>9.0f}%'.format(
+            shapeClass.__name__, baseline, compact, 100 * (baseline - compact) / baseline))
+
+
+if __name__ == '__main__':
+    main()
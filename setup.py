@@ -12,10 +12,10 @@ setup(
     url='https://github.com/AKSW/ShacShifter',
     download_url='https://github.com/AKSW/ShacShifter/archive/master.tar.gz',
     install_requires=[
-        'rdflib==4.2.1'
+        'rdflib>=6.0.0'
     ],
     dependency_links=[
-        'rdflib==4.2.1'
+        'rdflib>=6.0.0'
     ],
     packages=[
         'ShacShifter'
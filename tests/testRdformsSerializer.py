@@ -1,5 +1,6 @@
 from context import ShacShifter
 import unittest
+import json
 import os
 from os import path
 from ShacShifter.ShapeParser import ShapeParser
@@ -18,16 +19,60 @@ class RDFormsSerializerTests(unittest.TestCase):
         """Test if all valid Shape files are serialized without throwing an error."""
         exceptions = ['maxLowerMin.ttl', 'minGreaterMax.ttl', 'multipleMaxCounts.ttl', 'multipleMinCounts.ttl']
 
+        serializer = RDFormsSerializer()
         for f in os.listdir(self.dir):
-                if not os.path.isfile(f) or file in exceptions:
+                if (not os.path.isfile(path.join(self.dir, f)) or f in exceptions or
+                        f.startswith('negative') or not f.endswith('.ttl')):
                     continue
                 print(f)
                 shapes = ShapeParser().parseShape(path.join(self.dir, f))
-                serializer = RDFormsSerializer(shapes)
-                bundles = serializer.templateBundles
+                bundles = list(serializer.createTemplateBundles(shapes))
+                self.assertEqual(len(bundles), len(shapes))
                 for bundle in bundles:
                     self.assertTrue(isinstance(bundle, RDFormsTemplateBundle))
 
+    def testReusedSerializer(self):
+        """Test if a serializer only returns the bundles of the shapes of each call."""
+        serializer = RDFormsSerializer()
+        shapes = ShapeParser().parseShape(path.join(self.dir, 'w3c', 'AddressShape.ttl'))
+        first = serializer.serialize(shapes)
+        otherShapes = ShapeParser().parseShape(
+            path.join(self.dir, 'positiveNodeShapeParserExample1.ttl'))
+        self.assertEqual(len(json.loads(serializer.serialize(otherShapes))), len(otherShapes))
+        self.assertEqual(serializer.serialize(shapes), first)
+        self.assertEqual(len(json.loads(first)), len(shapes))
+
+    def testChoices(self):
+        """Test if the members of sh:in become top level choices that can be encoded as JSON."""
+        shapes = ShapeParser().parseShape(path.join(self.dir, 'w3c', 'InExampleShape.ttl'))
+        bundle = json.loads(RDFormsSerializer().serialize(shapes))[0]
+        choices = bundle['templates'][0]['choices']
+        self.assertEqual(len(choices), 2)
+        for choice in choices:
+            self.assertEqual(choice['value'], choice['label'])
+            self.assertTrue(choice['top'])
+            self.assertNotIn('children', choice)
+
+    def testDeduplicatedTemplates(self):
+        """Test if shared property shapes are emitted once and referenced by every bundle."""
+        shapes = ShapeParser().parseShape(
+            path.join(self.dir, 'positiveSharedPropertyShape.ttl'))
+        bundles = json.loads(RDFormsSerializer(dedup=True).serialize(shapes))
+        templates = {}
+        for bundle in bundles:
+            self.assertEqual(bundle['templates'][0]['id'], bundle['root'])
+            for template in bundle['templates'][1:]:
+                self.assertNotIn(template['id'], templates)
+                templates[template['id']] = template
+        self.assertEqual(len(templates), 2)
+
+        references = dict((bundle['root'], bundle['templates'][0]['items']) for bundle in bundles)
+        nameTemplates = set(references['http://www.example.org/PersonShape']) & set(
+            references['http://www.example.org/CompanyShape'])
+        self.assertEqual(len(nameTemplates), 1)
+        self.assertEqual(
+            templates[nameTemplates.pop()]['property'], 'http://www.example.org/name')
+
 
 def main():
     unittest.main()
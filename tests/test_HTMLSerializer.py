@@ -0,0 +1,167 @@
+import unittest
+import io
+import os
+import re
+import tempfile
+import rdflib
+from os import path
+from context import ShacShifter
+from ShacShifter.ShapeParser import ShapeParser
+from ShacShifter.HTMLSerializer import HTMLSerializer, HTMLFormTextItem, HTMLFormShapeReference
+from ShacShifter.modules.DatatypePatterns import DatatypePatterns
+from ShacShifter.modules.StringSupplier import StringSupplier
+
+
+class HTMLSerializerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = 'tests/_files/w3c'
+
+    def testChunkedForm(self):
+        """Test if the form is written in chunks that add up to the complete HTML."""
+        shapes = ShapeParser().parseShape(path.join(self.dir, 'AddressShape.ttl'))
+        serializer = HTMLSerializer()
+        form = next(serializer.createForms(shapes))
+        chunks = list(form.htmlChunks())
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(''.join(chunks), form.toHTML())
+
+        fp = io.StringIO()
+        serializer.write(ShapeParser().parseShape(path.join(self.dir, 'AddressShape.ttl')), fp)
+        self.assertIn(''.join(chunks) + '\n', fp.getvalue())
+
+    def testMultipleForms(self):
+        """Test if every node shape gets a form and the assets are written once."""
+        shapes = ShapeParser().parseShape(path.join(self.dir, 'AddressShape.ttl'))
+        html = HTMLSerializer().serialize(shapes)
+        self.assertEqual(len(shapes), 2)
+        self.assertEqual(html.count('<form'), 2)
+        self.assertEqual(html.count(StringSupplier.assets), 1)
+        self.assertEqual(html.count(StringSupplier.script), 1)
+        ids = re.findall(' id="([^"]*)"', html)
+        self.assertEqual(len(ids), len(set(ids)))
+
+    def testBlankNodeForms(self):
+        """Test if the forms of blank node shapes have distinct ids and no shared element ids."""
+        shapes = ShapeParser().parseShape('tests/_files/positiveBlankNodeShapes.ttl')
+        forms = list(HTMLSerializer().createForms(shapes))
+        self.assertEqual(len(forms), 2)
+        self.assertNotEqual(forms[0].id, forms[1].id)
+        html = HTMLSerializer().serialize(shapes)
+        self.assertEqual(html.count('<select name="targetClass">'), 2)
+        ids = re.findall(' id="([^"]*)"', html)
+        self.assertEqual(len(ids), len(set(ids)))
+
+    def testChoices(self):
+        """Test if the members of sh:in are rendered as radio buttons."""
+        shapes = ShapeParser().parseShape(path.join(self.dir, 'InExampleShape.ttl'))
+        html = HTMLSerializer().serialize(shapes)
+        self.assertIn('value="http://www.example.org/Pink"', html)
+        self.assertIn('value="http://www.example.org/Purple"', html)
+
+    def testDatatypePatterns(self):
+        """Test if text fields share the pattern of their datatype and are not changed."""
+        xsdDate = 'http://www.w3.org/2001/XMLSchema#date'
+        items = []
+        for i in range(2):
+            item = HTMLFormTextItem()
+            item.id = 'http://www.example.org/date' + str(i)
+            item.datatype = xsdDate
+            items.append(item)
+        pattern = DatatypePatterns.getPattern(xsdDate)
+        self.assertIs(DatatypePatterns.getPattern(xsdDate), pattern)
+        for item in items:
+            self.assertIn('data-pattern="{}"'.format(pattern), item.toHTML())
+            self.assertEqual(item.pattern, '')
+        self.assertEqual(DatatypePatterns.getPattern('http://www.example.org/unknown'), '')
+
+    def testExternalScript(self):
+        """Test if the script is written once to a file named by its hash and referenced."""
+        shapes = ShapeParser().parseShape(path.join(self.dir, 'AddressShape.ttl'))
+        with tempfile.TemporaryDirectory() as tempdir:
+            outputFile = path.join(tempdir, 'forms.html')
+            serializer = HTMLSerializer(outputFile, assets=HTMLSerializer.EXTERNAL)
+            serializer.write(shapes)
+            serializer.write(shapes)
+            scriptFiles = [f for f in os.listdir(tempdir) if f.endswith('.js')]
+            self.assertEqual(len(scriptFiles), 1)
+            with open(path.join(tempdir, scriptFiles[0])) as fp:
+                self.assertEqual(fp.read(), StringSupplier.runtime)
+            with open(outputFile) as fp:
+                html = fp.read()
+        self.assertIn('<script src="{}"></script>'.format(scriptFiles[0]), html)
+        self.assertNotIn(StringSupplier.runtime, html)
+
+    def testNodeCycle(self):
+        """Test if node shapes are expanded once per form and referenced after that."""
+        shapes = ShapeParser().parseShape('tests/_files/positiveNodeCycle.ttl')
+        serializer = HTMLSerializer()
+        form = serializer.createForm(shapes['http://www.example.org/CompanyShape'], shapes)
+        references = [item for item in form.formItems if isinstance(item, HTMLFormShapeReference)]
+        self.assertEqual(
+            [reference.shapeUri for reference in references],
+            ['http://www.example.org/PersonShape', 'http://www.example.org/CompanyShape',
+             'http://www.example.org/AddressShape'])
+        postalCodes = [item for item in form.formItems
+                       if getattr(item, 'property', '') == 'http://www.example.org/postalCode']
+        self.assertEqual(len(postalCodes), 1)
+
+        form = serializer.createForm(shapes['http://www.example.org/TeamShape'], shapes)
+        references = [item for item in form.formItems if isinstance(item, HTMLFormShapeReference)]
+        self.assertEqual(
+            [reference.shapeUri for reference in references],
+            ['http://www.example.org/PersonShape', 'http://www.example.org/PersonShape',
+             'http://www.example.org/AddressShape', 'http://www.example.org/CompanyShape'])
+
+        html = serializer.serialize(shapes)
+        ids = re.findall(' id="([^"]*)"', html)
+        self.assertEqual(len(ids), len(set(ids)))
+        personFormId = serializer.getFormId('http://www.example.org/PersonShape')
+        self.assertIn('<form action="" id="{}">'.format(personFormId), html)
+        self.assertIn('href="#{}"'.format(personFormId), html)
+
+    def testSharedNodeShapes(self):
+        """Test if a form grows linearly with the depth of a graph of shared node shapes."""
+        ex = rdflib.Namespace('http://www.example.org/')
+        sh = rdflib.Namespace('http://www.w3.org/ns/shacl#')
+        sizes = []
+        for depth in [12, 24]:
+            # every shape references the next one twice, so it has 2^depth paths to the last
+            g = rdflib.Graph()
+            for i in range(depth + 1):
+                shape = ex['Shape' + str(i)]
+                g.add((shape, rdflib.RDF.type, sh.NodeShape))
+                g.add((shape, sh.targetClass, ex['Class' + str(i)]))
+                for name in ['left', 'right', 'value']:
+                    propertyShape = rdflib.BNode()
+                    g.add((shape, sh.property, propertyShape))
+                    g.add((propertyShape, sh.path, ex[name]))
+                    if name != 'value' and i < depth:
+                        g.add((propertyShape, sh.node, ex['Shape' + str(i + 1)]))
+            with tempfile.TemporaryDirectory() as tempdir:
+                inputFile = path.join(tempdir, 'shapes.ttl')
+                g.serialize(inputFile, format='turtle', encoding='utf-8')
+                shapes = ShapeParser().parseShape(inputFile)
+            form = HTMLSerializer().createForm(shapes[str(ex.Shape0)], shapes)
+            sizes.append(len(form.toHTML()))
+        self.assertLess(sizes[1], 2.5 * sizes[0])
+
+    def testPropertyGroups(self):
+        """Test if the fields are ordered by group and the shapes stay unchanged."""
+        shapes = ShapeParser().parseShape('tests/_files/positiveSharedPropertyGroup.ttl')
+        serializer = HTMLSerializer()
+        form = serializer.createForm(shapes['http://www.example.org/SharedGroupShape'], shapes)
+        self.assertEqual(
+            [item.label for item in form.formItems],
+            ['<hr>email', '<hr><b>Name</b><br>givenName', 'familyName'])
+        self.assertEqual(serializer.serialize(shapes), serializer.serialize(shapes))
+        for propertyShape in shapes['http://www.example.org/SharedGroupShape'].properties:
+            self.assertFalse(propertyShape.isSet['name'])
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+import unittest
+import unittest.mock
+import io
+import json
+import tempfile
+from os import path
+from context import ShacShifter
+from ShacShifter.ShapeParser import ShapeParser
+from ShacShifter.RDFormsSerializer import RDFormsSerializer
+from ShacShifter.modules.JsonStreamWriter import JsonStreamWriter
+
+
+class JsonStreamWriterTests(unittest.TestCase):
+
+    values = [{'root': 'a', 'templates': [1, 2]}, {'root': 'b', 'templates': []}]
+
+    def write(self, mode, values):
+        fp = io.StringIO()
+        writer = JsonStreamWriter(fp, mode)
+        for value in values:
+            writer.write(value)
+        writer.close()
+        return fp.getvalue()
+
+    def testArrayModes(self):
+        """Test if the pretty and compact output is one valid JSON array."""
+        for mode in [JsonStreamWriter.PRETTY, JsonStreamWriter.COMPACT]:
+            self.assertEqual(json.loads(self.write(mode, self.values)), self.values)
+            self.assertEqual(json.loads(self.write(mode, [])), [])
+        self.assertNotIn(' ', self.write(JsonStreamWriter.COMPACT, self.values))
+
+    def testJsonLines(self):
+        """Test if every value is written as one line."""
+        lines = self.write(JsonStreamWriter.JSONL, self.values).splitlines()
+        self.assertEqual([json.loads(line) for line in lines], self.values)
+        self.assertEqual(self.write(JsonStreamWriter.JSONL, []), '')
+
+    def testUnknownMode(self):
+        with self.assertRaises(ValueError):
+            JsonStreamWriter(io.StringIO(), 'yaml')
+
+    def testSerializerOutput(self):
+        """Test if the RDForms bundles are written to the output file only."""
+        shapes = ShapeParser().parseShape('tests/_files/w3c/AddressShape.ttl')
+        with tempfile.TemporaryDirectory() as tempdir:
+            outputFile = path.join(tempdir, 'forms.jsonl')
+            serializer = RDFormsSerializer(outputFile, JsonStreamWriter.JSONL)
+            with unittest.mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+                serializer.write(shapes)
+            with open(outputFile) as fp:
+                bundles = [json.loads(line) for line in fp]
+        self.assertEqual(stdout.getvalue(), '')
+        self.assertEqual(len(bundles), len(shapes))
+        self.assertEqual(
+            sorted(bundle['root'] for bundle in bundles), sorted(shapes))
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+import unittest
+import os
+import tempfile
+import rdflib
+from os import path
+from context import ShacShifter
+from ShacShifter.ShacShifter import ShacShifter
+from ShacShifter.ShapeParser import ShapeParser
+from ShacShifter.modules.ShapeCache import ShapeCache
+
+
+class ShapeCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.shapesFile = path.abspath('tests/_files/w3c/AddressShape.ttl')
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def testCachedParse(self):
+        """Test if a second parse of the same file is loaded from the cache."""
+        shifter = ShacShifter()
+        shapes = shifter.parse(self.shapesFile, cacheDirectory=self.tempdir.name)
+        cache = ShapeCache(self.tempdir.name)
+        key = cache.getKey(self.shapesFile, ShapeParser.version, rdflib.__version__, False)
+        self.assertEqual(os.listdir(self.tempdir.name), [key + '.shapes'])
+
+        cachedShapes = shifter.parse(self.shapesFile, cacheDirectory=self.tempdir.name)
+        self.assertEqual(sorted(cachedShapes), sorted(shapes))
+        self.assertEqual(
+            cachedShapes['http://www.example.org/PersonShape'].properties[0].nodes,
+            ['http://www.example.org/AddressShape'])
+
+    def testKeyDependsOnOptions(self):
+        cache = ShapeCache(self.tempdir.name)
+        self.assertNotEqual(
+            cache.getKey(self.shapesFile, 1, False), cache.getKey(self.shapesFile, 2, False))
+        self.assertNotEqual(
+            cache.getKey(self.shapesFile, 1, False), cache.getKey(self.shapesFile, 1, True))
+
+    def testUntrustedEntry(self):
+        """Test if entries of another user are not loaded."""
+        cache = ShapeCache(self.tempdir.name)
+        cache.store('a', {'shape': 'a'})
+        cache.isTrusted = lambda stat: False
+        self.assertIsNone(cache.load('a'))
+
+    def testEviction(self):
+        """Test if the least recently used entries are removed first."""
+        cache = ShapeCache(self.tempdir.name, maxSize=1)
+        cache.store('a', {'shape': 'a' * 100})
+        self.assertIsNone(cache.load('a'))
+
+        cache.maxSize = 10 * 1024
+        cache.store('a', {'shape': 'a'})
+        cache.store('b', {'shape': 'b'})
+        os.utime(cache.getPath('a'), (0, 0))
+        cache.maxSize = os.path.getsize(cache.getPath('b'))
+        cache.evict()
+        self.assertIsNone(cache.load('a'))
+        self.assertEqual(cache.load('b'), {'shape': 'b'})
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+import unittest
+import json
+import tempfile
+from os import path
+from context import ShacShifter
+from ShacShifter.ShapeWatcher import ShapeWatcher
+
+
+class ShapeWatcherTests(unittest.TestCase):
+
+    prefixes = """@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://www.example.org/> .
+"""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.input = path.join(self.tempdir.name, 'shapes.ttl')
+        self.output = path.join(self.tempdir.name, 'shapes.json')
+        self.watcher = ShapeWatcher(self.input, self.output, 'rdforms', None, None, None)
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def writeShapes(self, postalCodeDatatype, animalPath):
+        with open(self.input, 'w') as fp:
+            fp.write(self.prefixes + """
+ex:PersonShape a sh:NodeShape ;
+    sh:targetClass ex:Person ;
+    sh:property [ sh:path ex:address ; sh:node ex:AddressShape ] .
+
+ex:AddressShape a sh:NodeShape ;
+    sh:property [ sh:path ex:postalCode ; sh:datatype xsd:{} ] .
+
+ex:AnimalShape a sh:NodeShape ;
+    sh:targetClass ex:Animal ;
+    sh:property [ sh:path ex:{} ] .
+""".format(postalCodeDatatype, animalPath))
+
+    def testIncrementalUpdate(self):
+        """Test if only changed shapes and the shapes depending on them are shifted again."""
+        self.writeShapes('string', 'name')
+        self.assertEqual(len(self.watcher.update()), 3)
+        animalShape = self.watcher.shapes['http://www.example.org/AnimalShape']
+
+        self.writeShapes('integer', 'name')
+        self.assertEqual(
+            sorted(self.watcher.update()),
+            ['http://www.example.org/AddressShape', 'http://www.example.org/PersonShape'])
+        self.assertIs(self.watcher.shapes['http://www.example.org/AnimalShape'], animalShape)
+
+        self.writeShapes('integer', 'species')
+        self.assertEqual(self.watcher.update(), ['http://www.example.org/AnimalShape'])
+        self.assertEqual(self.watcher.update(), [])
+
+        with open(self.output) as fp:
+            content = fp.read()
+        self.assertEqual(len(json.loads(content)), 3)
+        self.assertIn(json.dumps('http://www.example.org/species'), content)
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
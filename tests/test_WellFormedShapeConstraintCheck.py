@@ -5,8 +5,10 @@ from os import path
 from context import ShacShifter
 from rdflib.namespace import XSD
 from ShacShifter.modules.WellFormedShapeConstraintCheck import WellFormedShapeConstraintCheck
+from ShacShifter.modules.GraphConstraintCheck import GraphConstraintCheck
 from ShacShifter.modules.NodeShape import NodeShape
 from ShacShifter.modules.PropertyShape import PropertyShape
+from ShacShifter.modules.Exceptions import ShaclListConstraintError
 
 
 
@@ -34,6 +36,79 @@ class WellFormedShapeConstraintCheckTests(unittest.TestCase):
             wfscc = WellFormedShapeConstraintCheck(self.g, stmt)
             self.assertEqual(len(wfscc.errors), 44)
 
+    def testGraphConstraintCheck(self):
+        """Test if the checks of the whole graph equal the checks of single shapes."""
+        self.g.parse(path.join(self.dir, 'negativeFullFailureCount.ttl'), format='turtle')
+        graphCheck = GraphConstraintCheck(self.g)
+        shapes = [self.ex.FullNegativeExampleShape]
+        shapes += list(self.g.objects(self.ex.FullNegativeExampleShape, self.sh.property))
+        for shape in shapes:
+            errors = WellFormedShapeConstraintCheck(self.g, shape, graphCheck=graphCheck).errors
+            singleErrors = WellFormedShapeConstraintCheck(self.g, shape).errors
+            self.assertEqual(
+                [(type(error), str(error)) for error in errors],
+                [(type(error), str(error)) for error in singleErrors])
+        self.assertEqual(graphCheck.getErrors(self.ex.UnknownShape), [])
+
+    def testLongShaclList(self):
+        """Test if lists longer than the recursion limit are decoded and cached."""
+        head = rdflib.BNode()
+        node = head
+        for i in range(10000):
+            rest = rdflib.BNode() if i < 9999 else rdflib.RDF.nil
+            self.g.add((node, rdflib.RDF.first, rdflib.Literal(str(i))))
+            self.g.add((node, rdflib.RDF.rest, rest))
+            node = rest
+        self.g.add((self.ex.CodeListShape, self.sh['in'], head))
+
+        wfscc = WellFormedShapeConstraintCheck(self.g, self.ex.CodeListShape)
+        self.assertEqual(len(wfscc.errors), 0)
+        members = wfscc.listDecoder.decode(head)
+        self.assertEqual(len(members), 10000)
+        self.assertIs(wfscc.listDecoder.decode(head), members)
+
+    def testShaclListLoop(self):
+        """Test if a loop in a list is reported instead of walking endlessly."""
+        head = rdflib.BNode()
+        second = rdflib.BNode()
+        self.g.add((head, rdflib.RDF.first, rdflib.Literal('a')))
+        self.g.add((head, rdflib.RDF.rest, second))
+        self.g.add((second, rdflib.RDF.first, rdflib.Literal('b')))
+        self.g.add((second, rdflib.RDF.rest, head))
+        self.g.add((self.ex.LoopShape, self.sh['in'], head))
+
+        wfscc = WellFormedShapeConstraintCheck(self.g, self.ex.LoopShape)
+        self.assertEqual([type(error) for error in wfscc.errors], [ShaclListConstraintError])
+
+        # every decode of the cached list raises a new error
+        errors = []
+        for i in range(2):
+            with self.assertRaises(ShaclListConstraintError) as context:
+                wfscc.listDecoder.decode(head)
+            errors.append(context.exception)
+        self.assertIsNot(errors[0], errors[1])
+        self.assertEqual(str(errors[0]), str(errors[1]))
+        self.assertIsNot(errors[0], wfscc.errors[0])
+
+    def testShaclListCells(self):
+        """Test if cells without exactly one rdf:first and rdf:rest are reported."""
+        for predicate, objects in [(rdflib.RDF.first, []), (rdflib.RDF.first, ['a', 'b']),
+                                   (rdflib.RDF.rest, []), (rdflib.RDF.rest, [rdflib.RDF.nil, 'b'])]:
+            g = rdflib.Graph()
+            head = rdflib.BNode()
+            if predicate == rdflib.RDF.first:
+                g.add((head, rdflib.RDF.rest, rdflib.RDF.nil))
+            else:
+                g.add((head, rdflib.RDF.first, rdflib.Literal('a')))
+            for object in objects:
+                if not isinstance(object, rdflib.term.Node):
+                    object = rdflib.Literal(object)
+                g.add((head, predicate, object))
+            g.add((self.ex.BrokenListShape, self.sh['in'], head))
+
+            wfscc = WellFormedShapeConstraintCheck(g, self.ex.BrokenListShape)
+            self.assertEqual([type(error) for error in wfscc.errors], [ShaclListConstraintError])
+
 
 
 def main():
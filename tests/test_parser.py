@@ -1,18 +1,29 @@
 import unittest
 import rdflib
 import os
+import pickle
+import random
+import sys
+import tempfile
 from os import path
 from context import ShacShifter
+from rdflib.compare import isomorphic
 from rdflib.namespace import XSD
 from ShacShifter.ShapeParser import ShapeParser
 from ShacShifter.modules.NodeShape import NodeShape
 from ShacShifter.modules.PropertyShape import PropertyShape
+from ShacShifter.modules.PropertyPath import PropertyPath
+from ShacShifter.modules.PropertyGroup import PropertyGroup
+from ShacShifter.modules.WellFormedShape import WellFormedShape
+from ShacShifter.modules.StreamingShapeLoader import StreamingShapeLoader
+from ShacShifter.modules.Exceptions import PathError, ShapeConflictError, ShapeCycleError
 
 
 class ShapeParserTests(unittest.TestCase):
 
     w3c_test_files = 'tests/_files/w3c'
     ex = rdflib.Namespace('http://www.example.org/')
+    sh = rdflib.Namespace('http://www.w3.org/ns/shacl#')
 
     def setUp(self):
         self.parser = ShapeParser()
@@ -45,11 +56,11 @@ class ShapeParserTests(unittest.TestCase):
 
         self.assertEqual(personShape.uri, str(self.ex.PersonShape))
 
-        self.assertEqual(postalCodeShape.path, str(self.ex.postalCode))
+        self.assertEqual(postalCodeShape.path.iri, str(self.ex.postalCode))
         self.assertEqual(postalCodeShape.datatype, str(XSD.string))
         self.assertEqual(postalCodeShape.maxCount, 1)
 
-        self.assertEqual(addressPropertyShape.path, str(self.ex.address))
+        self.assertEqual(addressPropertyShape.path.iri, str(self.ex.address))
         self.assertEqual(addressPropertyShape.minCount, 1)
         self.assertEqual(addressPropertyShape.nodes[0], str(self.ex.AddressShape))
 
@@ -66,7 +77,7 @@ class ShapeParserTests(unittest.TestCase):
         self.assertTrue(len(nodeShape.targetNode), 3)
         self.assertTrue(len(nodeShapesDict), 1)
 
-        self.assertEqual(propertyShape.path, str(self.ex.address))
+        self.assertEqual(propertyShape.path.iri, str(self.ex.address))
         self.assertEqual(propertyShape.classes[0], str(self.ex.PostalAddress))
         self.assertTrue(len(propertyShape.classes), 1)
 
@@ -81,7 +92,7 @@ class ShapeParserTests(unittest.TestCase):
                 if propertyShape.isSet['qualifiedValueShape']:
                     # One thumb and four fingers
                     self.assertTrue(propertyShape.isSet['qualifiedValueShapesDisjoint'])
-                    self.assertEqual(propertyShape.path, str(self.ex.digit))
+                    self.assertEqual(propertyShape.path.iri, str(self.ex.digit))
                     self.assertEqual(
                         values[propertyShape.qualifiedValueShape.classes[0]],
                         propertyShape.qualifiedMinCount)
@@ -90,7 +101,7 @@ class ShapeParserTests(unittest.TestCase):
                         propertyShape.qualifiedMaxCount)
                 else:
                     # Hand
-                    self.assertEqual(propertyShape.path, str(self.ex.digit))
+                    self.assertEqual(propertyShape.path.iri, str(self.ex.digit))
                     self.assertFalse(propertyShape.isSet['qualifiedValueShapesDisjoint'])
                     self.assertEqual(propertyShape.maxCount, 5)
 
@@ -236,6 +247,295 @@ class ShapeParserTests(unittest.TestCase):
         self.assertEqual(str(propertyShapeA.description['de']), "B")
         self.assertEqual(str(propertyShapeB.path), 'http://www.example.org/PathB')
 
+    def testShapeParameters(self):
+        """Test if the parameter scan only collects known SHACL parameters."""
+        self.parser.g.parse(path.join(self.w3c_test_files, 'ClassExampleShape.ttl'), format='turtle')
+        parameters = self.parser.getShapeParameters(self.ex.ClassExampleShape)
+        self.assertEqual(
+            sorted(parameters), sorted([self.parser.sh.targetNode, self.parser.sh.property]))
+        self.assertEqual(len(parameters[self.parser.sh.targetNode]), 3)
+
+    def testRootShapeDiscovery(self):
+        """Test if roots and unused property shapes are found by the graph index."""
+        self.parser.g.parse(
+            self.dir + '/w3c/ExampleNodeShapeWithPropertyShapes.ttl', format='turtle')
+        self.assertEqual(
+            sorted(self.parser.getWellFormedShapeUris()),
+            sorted([self.ex.ExampleNodeShapeWithPropertyShapes, self.ex.ExamplePropertyShape]))
+        self.assertEqual(
+            self.parser.getPropertyShapeCandidates(), set([self.ex.ExamplePropertyShape]))
+
+    def testSharedPropertyGroup(self):
+        """Test if a property group used by several property shapes is parsed once."""
+        nodeShapes = self.parser.parseShape(self.dir + '/positiveSharedPropertyGroup.ttl')
+        nodeShape = nodeShapes[str(self.ex.SharedGroupShape)]
+        groups = [shape.group for shape in nodeShape.properties if shape.isSet['group']]
+        self.assertEqual(len(groups), 2)
+        self.assertIs(groups[0], groups[1])
+        self.assertIsInstance(groups[0], PropertyGroup)
+        self.assertEqual(groups[0].uri, str(self.ex.NameGroup))
+        self.assertEqual(groups[0].order, 0)
+        self.assertEqual(groups[0].getLabel(), 'Name')
+        self.assertEqual(len(self.parser.propertyGroups), 1)
+        # groups are no shapes, only the node shape and its property shapes are parsed
+        self.assertEqual(self.parser.statistics['uniqueShapes'], 4)
+
+    def testParallelConstraintCheck(self):
+        """Test if checking the shapes in a process pool finds the same errors."""
+        inputFile = self.dir + '/positiveNodeShapeParserExample1.ttl'
+        nodeShape = self.parser.parseShape(inputFile, checkProcesses=2)[
+            'http://www.example.org/exampleShape']
+        serialNodeShape = ShapeParser().parseShape(inputFile)[
+            'http://www.example.org/exampleShape']
+        self.assertEqual(
+            [str(error) for error in nodeShape.errors],
+            [str(error) for error in serialNodeShape.errors])
+        # the untagged sh:message literal is an xsd:string
+        self.assertEqual(nodeShape.errors, [])
+        self.assertEqual(self.parser.checkedErrors, {})
+
+    def testParallelCheckAndParse(self):
+        """Test if the checked errors are used by the parse workers and cleared after parsing."""
+        for inputFile in ['positiveNodeCycle.ttl', 'multipleMinCounts.ttl',
+                          'positiveBlankNodeShapes.ttl']:
+            parser = ShapeParser()
+            nodeShapes = parser.parseShape(
+                path.join(self.dir, inputFile), processes=2, checkProcesses=2)
+            serialNodeShapes = ShapeParser().parseShape(path.join(self.dir, inputFile))
+            self.assertEqual(parser.checkedErrors, {})
+            self.assertEqual(len(nodeShapes), len(serialNodeShapes))
+            for shapeUri, shape in nodeShapes.items():
+                if shape.isSet['uri']:
+                    self.assertEqual(
+                        [str(error) for error in shape.errors],
+                        [str(error) for error in serialNodeShapes[shapeUri].errors])
+
+    def testParallelParseStatistics(self):
+        """Test if the merged statistics of the parse workers equal those of a serial parse."""
+        for inputFile in ['positiveSharedPropertyShape.ttl', 'positiveBlankNodeShapes.ttl',
+                          'positiveNodeCycle.ttl', 'positiveSharedPropertyGroup.ttl']:
+            serialParser = ShapeParser()
+            serialParser.parseShape(path.join(self.dir, inputFile))
+            for processes in [2, 3]:
+                poolParser = ShapeParser()
+                poolParser.parseShape(path.join(self.dir, inputFile), processes=processes)
+                self.assertEqual(poolParser.statistics, serialParser.statistics)
+
+    def testShapeClassification(self):
+        """Test if shapes are built as NodeShape, PropertyShape or WellFormedShape directly."""
+        nodeShapes = self.parser.parseShape(self.dir + '/positiveSharedPropertyGroup.ttl')
+        nodeShape = nodeShapes[str(self.ex.SharedGroupShape)]
+        self.assertIsInstance(nodeShape, NodeShape)
+        for propertyShape in nodeShape.properties:
+            self.assertIsInstance(propertyShape, PropertyShape)
+            if propertyShape.isSet['group']:
+                self.assertIsInstance(propertyShape.group, PropertyGroup)
+
+        # annotations that a NodeShape has no field for don't change the class
+        self.assertIs(
+            self.parser.getShapeClass(
+                self.ex.AnnotatedShape, {self.sh.targetClass: [], self.sh.name: []}),
+            NodeShape)
+        self.assertIs(
+            self.parser.getShapeClass(self.ex.QualifiedShape, {self.sh['class']: []}),
+            WellFormedShape)
+
+    def testPropertyShapeErrors(self):
+        """Test if property shapes report their errors and untagged literals are strings."""
+        shapes = ShapeParser().parseShape(path.join(self.dir, 'multipleMinCounts.ttl'))
+        nodeShape = shapes['http://www.example.org/ExampleShape']
+        self.assertEqual(len(nodeShape.properties[0].errors), 1)
+        self.assertEqual(nodeShape.errors, nodeShape.properties[0].errors)
+
+        shapes = ShapeParser().parseShape(
+            path.join(self.dir, 'positivePropertyShapeParserExample.ttl'))
+        for shape in shapes.values():
+            self.assertEqual(shape.errors, [])
+
+    def testCompactShapeModel(self):
+        """Test if unset fields share immutable defaults and set fields are flagged."""
+        shape = PropertyShape()
+        otherShape = PropertyShape()
+        self.assertFalse(hasattr(shape, '__dict__'))
+        self.assertIs(shape.classes, otherShape.classes)
+        self.assertEqual(shape.classes, [])
+        with self.assertRaises(TypeError):
+            shape.classes.append('http://www.example.org/A')
+        self.assertIsNot(shape.errors, otherShape.errors)
+
+        shape.isSet['classes'] = True
+        shape.classes = ['http://www.example.org/A']
+        self.assertTrue(shape.isSet['classes'])
+        self.assertFalse(otherShape.isSet['classes'])
+        with self.assertRaises(KeyError):
+            shape.isSet['properties']
+
+        copiedShape = pickle.loads(pickle.dumps(shape))
+        self.assertTrue(copiedShape.isSet['classes'])
+        self.assertEqual(copiedShape.classes, ['http://www.example.org/A'])
+        self.assertIs(copiedShape.nodes, otherShape.nodes)
+
+    def testLazyParse(self):
+        """Test if a lazy parse lists all root shapes and parses a shape on first access."""
+        nodeShapes = self.parser.parseShape(self.dir + '/split', lazy=True)
+        self.assertEqual(
+            sorted(nodeShapes), [str(self.ex.AddressShape), str(self.ex.PersonShape)])
+        self.assertEqual(self.parser.statistics['uniqueShapes'], 0)
+
+        personShape = nodeShapes[str(self.ex.PersonShape)]
+        self.assertTrue(nodeShapes.isParsed(str(self.ex.PersonShape)))
+        self.assertFalse(nodeShapes.isParsed(str(self.ex.AddressShape)))
+        self.assertEqual(personShape.properties[0].nodes[0], str(self.ex.AddressShape))
+        self.assertIs(nodeShapes[str(self.ex.PersonShape)], personShape)
+        self.assertEqual(self.parser.statistics['uniqueShapes'], 2)
+
+    def testComplexPaths(self):
+        """Test if complex paths are parsed to shared paths with their SPARQL path."""
+        nodeShapes = self.parser.parseShape(self.dir + '/positiveComplexPaths.ttl')
+        paths = [shape.path for shape in nodeShapes[str(self.ex.ComplexPathShape)].properties]
+        self.assertEqual(sorted(path.sparql for path in paths), [
+            '(<http://www.example.org/parent>/<http://www.example.org/sibling>)+',
+            '(^<http://www.example.org/child>)*',
+            '<http://www.example.org/father>|<http://www.example.org/mother>',
+            '<http://www.example.org/parent>/^<http://www.example.org/child>'
+        ])
+        sequencePath = [path for path in paths if path.kind == PropertyPath.SEQUENCE][0]
+        zeroOrMorePath = [path for path in paths if path.kind == PropertyPath.ZERO_OR_MORE][0]
+        self.assertIs(sequencePath.members[1], zeroOrMorePath.members[0])
+        self.assertEqual(sequencePath.members[0].iri, str(self.ex.parent))
+        self.assertFalse(sequencePath.isPredicatePath)
+        self.assertEqual(sequencePath, pickle.loads(pickle.dumps(sequencePath)))
+        self.assertEqual(sequencePath.id, PropertyPath(
+            PropertyPath.SEQUENCE, None, sequencePath.members).id)
+
+    def testDeepPaths(self):
+        """Test if paths deeper than the recursion limit are parsed."""
+        head = rdflib.BNode()
+        node = head
+        for i in range(5000):
+            rest = rdflib.BNode() if i < 4999 else rdflib.RDF.nil
+            self.parser.g.add((node, rdflib.RDF.first, self.ex['p' + str(i % 10)]))
+            self.parser.g.add((node, rdflib.RDF.rest, rest))
+            node = rest
+        inversePath = self.ex.p0
+        for i in range(5000):
+            node = rdflib.BNode()
+            self.parser.g.add((node, self.sh.inversePath, inversePath))
+            inversePath = node
+
+        sequencePath = self.parser.getPropertyPath(head)
+        self.assertEqual(len(sequencePath.members), 5000)
+        self.assertIs(sequencePath.members[0], sequencePath.members[10])
+        self.assertEqual(self.parser.getPropertyPath(inversePath).kind, PropertyPath.INVERSE)
+
+    def testDeepAndCyclicPathShapes(self):
+        """Test if deep and cyclic paths are checked and parsed without recursion."""
+        g = rdflib.Graph()
+        inversePath = self.ex.p0
+        for i in range(2000):
+            node = rdflib.BNode()
+            g.add((node, self.sh.inversePath, inversePath))
+            inversePath = node
+        propertyShape = rdflib.BNode()
+        g.add((self.ex.DeepPathShape, self.sh.targetClass, self.ex.Person))
+        g.add((self.ex.DeepPathShape, self.sh.property, propertyShape))
+        g.add((propertyShape, self.sh.path, inversePath))
+        with tempfile.TemporaryDirectory() as tempdir:
+            inputFile = path.join(tempdir, 'deepPath.ttl')
+            g.serialize(inputFile, format='nt', encoding='utf-8')
+            nodeShape = self.parser.parseShape(inputFile)[str(self.ex.DeepPathShape)]
+        self.assertEqual(nodeShape.errors, [])
+        self.assertEqual(nodeShape.properties[0].path.kind, PropertyPath.INVERSE)
+
+        nodeShape = ShapeParser().parseShape(self.dir + '/negativePathCycle.ttl')[
+            str(self.ex.PathCycleShape)]
+        self.assertEqual([type(error) for error in nodeShape.errors], [PathError])
+        self.assertFalse(nodeShape.properties[0].isSet['path'])
+
+    def testInternedStrings(self):
+        """Test if every IRI of the model is stored once."""
+        nodeShapes = self.parser.parseShape(self.dir + '/split')
+        addressShape = nodeShapes[str(self.ex.AddressShape)]
+        personShape = nodeShapes[str(self.ex.PersonShape)]
+        self.assertIs(personShape.properties[0].nodes[0], addressShape.uri)
+        self.assertEqual(self.parser.statistics['internedStrings'], 6)
+        self.assertEqual(
+            self.parser.statistics['internedBytesSaved'], sys.getsizeof(addressShape.uri))
+
+    def testShapeCycle(self):
+        """Test if a reference cycle is reported as error instead of recursing endlessly."""
+        nodeShapes = self.parser.parseShape(self.dir + '/negativeShapeCycle.ttl')
+        nodeShape = nodeShapes[str(self.ex.CycleShape)]
+        knownPersonShape = nodeShape.properties[0].qualifiedValueShape
+        self.assertEqual(len(knownPersonShape.properties), 0)
+        self.assertEqual(
+            [type(error) for error in knownPersonShape.errors], [ShapeCycleError])
+        # the cycle error reaches the root shape through the property shape
+        self.assertEqual([type(error) for error in nodeShape.errors], [ShapeCycleError])
+        self.assertEqual(nodeShape.properties[0].errors, knownPersonShape.errors)
+
+    def testStreamingParse(self):
+        """Test if only the shapes of an N-Quads dump are kept in streaming mode."""
+        nodeShapes = self.parser.parseShape(self.dir + '/shapesWithInstanceData.nq', True)
+        self.assertEqual(list(nodeShapes), [str(self.ex.PersonShape)])
+        self.assertEqual(len(self.parser.g), 12)
+        self.assertIsNone(self.parser.g.value(self.ex.alice, self.ex.name))
+        # labels are only kept for shapes and property groups
+        self.assertIsNone(self.parser.g.value(self.ex.Person, rdflib.RDFS.label))
+
+        propertyShape = nodeShapes[str(self.ex.PersonShape)].properties[0]
+        self.assertEqual(propertyShape.path.iri, str(self.ex.name))
+        self.assertEqual(propertyShape.languageIn, ['en', 'de'])
+        self.assertEqual(propertyShape.group.label['default'], 'Name')
+
+    def testStreamingLineOrder(self):
+        """Test if streaming keeps all list cells, independent of the order of the lines."""
+        g = rdflib.Graph()
+        for inputFile in ['positivePropertyShapeParserExample.ttl', 'positiveComplexPaths.ttl']:
+            g.parse(path.join(self.dir, inputFile), format='turtle')
+        lines = g.serialize(format='nt').strip().split('\n')
+        with tempfile.TemporaryDirectory() as tempdir:
+            inputFile = path.join(tempdir, 'shapes.nt')
+            for seed in range(30):
+                random.Random(seed).shuffle(lines)
+                with open(inputFile, 'w') as fp:
+                    fp.write('\n'.join(lines) + '\n')
+                streamedGraph = StreamingShapeLoader().load(inputFile, rdflib.Graph())
+                self.assertTrue(isomorphic(streamedGraph, g))
+
+    def testMultipleFilesParse(self):
+        """Test if shapes split across files are parsed like a single file."""
+        parsers = []
+        for processes in [None, 2]:
+            parser = ShapeParser()
+            nodeShapesDict = parser.parseShape(self.dir + '/split', processes=processes)
+            self.assertEqual(
+                sorted(nodeShapesDict), [str(self.ex.AddressShape), str(self.ex.PersonShape)])
+            personShape = nodeShapesDict[str(self.ex.PersonShape)]
+            self.assertEqual(personShape.properties[0].nodes[0], str(self.ex.AddressShape))
+            self.assertEqual(personShape.errors, [])
+            parsers.append(parser)
+
+        # the state of the worker processes is merged into the parser
+        serialParser, poolParser = parsers
+        self.assertEqual(len(poolParser.parsedShapes), len(serialParser.parsedShapes))
+        self.assertEqual(len(poolParser.propertyShapes), len(serialParser.propertyShapes))
+        self.assertEqual(poolParser.statistics, serialParser.statistics)
+        for shapeUri, shape in poolParser.wellFormedShapes.items():
+            self.assertIs(poolParser.parsedShapes[rdflib.URIRef(shapeUri)], shape)
+
+        with self.assertRaises(FileNotFoundError):
+            ShapeParser().parseShape([self.dir + '/split', self.dir + '/split/*.nomatch'])
+
+    def testMultipleFilesConflict(self):
+        """Test if shapes that are defined in more than one file are reported."""
+        nodeShapesDict = self.parser.parseShape(
+            [self.dir + '/split/*.ttl', path.join(self.w3c_test_files, 'AddressShape.ttl')])
+        self.assertEqual(
+            sorted(self.parser.conflicts), [self.ex.AddressShape, self.ex.PersonShape])
+        errors = nodeShapesDict[str(self.ex.AddressShape)].errors
+        self.assertEqual([type(error) for error in errors], [ShapeConflictError])
+
     def testUnusedPropertyShapeParse(self):
         wellFormedShapes = self.parser.parseShape(
             self.dir + '/w3c/ExampleNodeShapeWithPropertyShapes.ttl')